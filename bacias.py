@@ -0,0 +1,176 @@
+"""
+Bacias de Atendimento - Sofá Novo de Novo
+Municípios vizinhos agrupados por distância de carro para dividir um sofázinho
+
+A alocação trata cada município isoladamente. Aqui, pelos centroides dos
+municípios (índice espacial):
+- município sem franquia a até a distância de uma cidade com franquia (padrão
+  ou atual) já é atendido por ela: o sofázinho dele sai da conta;
+- municípios que já têm sofázinho continuam com o seu e são polos: cada
+  vizinho livre vai para o polo com sofázinho mais próximo;
+- dois ou mais municípios ainda livres vizinhos somam população e score: a
+  bacia que atinge o mínimo do sofázinho ganha uma unidade no polo. Os polos
+  novos são avaliados do mais populoso ao menos, e um município ao alcance de
+  dois polos novos fica com o primeiro (a bacia dele dependia desse município).
+
+As bacias são estrelas em torno do polo (todo membro está a até a distância
+do polo), não cadeias de vizinhos. Os totais das outras abas continuam por
+município; o resultado das bacias é mostrado à parte (Insights).
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import espacial
+import malhas
+from modelo_score import POPULACAO_SOFAZINHO, SCORE_SOFAZINHO
+
+# Distância de carro (km) até onde o cliente se desloca para o serviço
+DISTANCIA_BACIA_KM = 30
+
+# Distância de carro / distância em linha reta (média das estradas brasileiras)
+FATOR_ROTA = 1.3
+
+# Papel do município na bacia
+SEM_BACIA, POLO, MEMBRO, ATENDIDO_POR_FRANQUIA = range(4)
+PAPEIS = ['Sem bacia', 'Polo', 'Membro', 'Atendido por franquia']
+
+
+def _centroide(geometria):
+    """Centroide (lon, lat) pela área dos anéis externos; média dos vértices se a área for nula"""
+    poligonos = geometria['coordinates'] if geometria['type'] == 'MultiPolygon' else [geometria['coordinates']]
+    area = momento_x = momento_y = 0.0
+    for poligono in poligonos:
+        anel = np.asarray(poligono[0], dtype=np.float64)
+        x, y = anel[:, 0], anel[:, 1]
+        cruz = x[:-1] * y[1:] - x[1:] * y[:-1]
+        area += cruz.sum() / 2
+        momento_x += ((x[:-1] + x[1:]) * cruz).sum() / 6
+        momento_y += ((y[:-1] + y[1:]) * cruz).sum() / 6
+    if area == 0:
+        vertices = np.vstack([np.asarray(poligono[0], dtype=np.float64) for poligono in poligonos])
+        return vertices[:, 0].mean(), vertices[:, 1].mean()
+    return momento_x / area, momento_y / area
+
+
+def centroides_municipios(caminho=None):
+    """Codigo_IBGE, lat e lon dos municípios pela malha local (malhas.py); None se a malha não existir"""
+    caminho = caminho or malhas.caminho_malha('municipio')
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        feicoes = json.load(arquivo)['features']
+
+    centroides = [_centroide(feicao['geometry']) for feicao in feicoes]
+    return pd.DataFrame({
+        'Codigo_IBGE': np.array([feicao['id'] for feicao in feicoes], dtype=np.int64),
+        'lat': [lat for _, lat in centroides],
+        'lon': [lon for lon, _ in centroides]
+    })
+
+
+def formar_bacias(lat, lon, populacao, score, franquia, sofazinho,
+                  distancia_km=DISTANCIA_BACIA_KM, score_sofazinho=SCORE_SOFAZINHO):
+    """Posição do polo (ou da cidade com franquia) de cada município, papel na bacia e sofázinhos finais"""
+    lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+    populacao, score = np.asarray(populacao, dtype=np.float64), np.asarray(score, dtype=np.float64)
+    franquia, sofazinho = np.asarray(franquia, dtype=bool), np.asarray(sofazinho, dtype=bool)
+    raio_km = distancia_km / FATOR_ROTA
+    n = len(lat)
+
+    polo = np.full(n, -1, dtype=np.int64)
+    papel = np.full(n, SEM_BACIA, dtype=np.int8)
+
+    # Cidades com franquia atendem os municípios sem franquia ao redor (a mais próxima)
+    com_franquia = np.flatnonzero(franquia)
+    polo[com_franquia] = com_franquia
+    if len(com_franquia):
+        indice_franquias = espacial.indexar(lat[com_franquia], lon[com_franquia])
+        mais_proxima, distancia = espacial.mais_proximo(indice_franquias, lat, lon)
+        atendido = ~franquia & (distancia <= raio_km)
+        polo[atendido] = com_franquia[mais_proxima[atendido]]
+        papel[atendido] = ATENDIDO_POR_FRANQUIA
+
+    # Municípios livres com sofázinho são polos; vizinho livre vai para o polo mais próximo
+    com_sofazinho = np.flatnonzero((polo < 0) & sofazinho)
+    polo[com_sofazinho] = com_sofazinho
+    papel[com_sofazinho] = POLO
+    if len(com_sofazinho):
+        indice_polos = espacial.indexar(lat[com_sofazinho], lon[com_sofazinho])
+        mais_proximo, distancia = espacial.mais_proximo(indice_polos, lat, lon)
+        membro = (polo < 0) & (distancia <= raio_km)
+        polo[membro] = com_sofazinho[mais_proximo[membro]]
+        papel[membro] = MEMBRO
+
+    # Vizinhos de todos os municípios de uma vez (CSR); o laço só consulta as faixas
+    ponteiros, vizinhos, _ = espacial.vizinhos_no_raio(espacial.indexar(lat, lon), lat, lon, raio_km)
+    livre = polo < 0
+
+    # Bacias novas, do maior município ao menor; só somando municípios (sozinho,
+    # o município já foi avaliado pela alocação)
+    minimo_populacao = POPULACAO_SOFAZINHO[0]
+    for i in np.argsort(-populacao, kind='stable'):
+        if not livre[i]:
+            continue
+        membros = vizinhos[ponteiros[i]:ponteiros[i + 1]]
+        membros = membros[livre[membros]]
+        if len(membros) > 1 and populacao[membros].sum() >= minimo_populacao and \
+                score[membros].sum() >= score_sofazinho:
+            polo[membros] = i
+            papel[membros] = MEMBRO
+            papel[i] = POLO
+            livre[membros] = False
+
+    # Cidade com franquia que também tem sofázinho fica com ele (não entra no laço de polos)
+    sofazinho_bacia = ((papel == POLO) | (franquia & sofazinho)).astype(np.int64)
+    return polo, papel, sofazinho_bacia
+
+
+def colunas_alocacao(df):
+    """Colunas de franquias padrão e sofázinho: corrigidas se a base tiver, senão as realistas"""
+    if 'Franquias_Padrao_Corrigida' in df.columns:
+        return 'Franquias_Padrao_Corrigida', 'Franquias_Sofazinho_Corrigida'
+    return 'Franquias_Padrao_Realista', 'Franquias_Sofazinho_Realista'
+
+
+def bacias_municipios(df, centroides, distancia_km=DISTANCIA_BACIA_KM, score_sofazinho=SCORE_SOFAZINHO):
+    """Bacia de cada município do DataFrame do modelo; sem centroide, fica como está"""
+    posicao = pd.Index(centroides['Codigo_IBGE']).get_indexer(df['Codigo_IBGE'])
+    com_centroide = np.flatnonzero(posicao >= 0)
+    linhas = posicao[com_centroide]
+
+    coluna_padrao, coluna_sofazinho = colunas_alocacao(df)
+    franquia = (df[coluna_padrao].to_numpy() > 0) | (df['Franquias_Atuais'].fillna(0).to_numpy() > 0)
+    sofazinho = df[coluna_sofazinho].to_numpy() > 0
+    populacao = df['Populacao_2022'].to_numpy(dtype=np.float64)
+
+    polo, papel, sofazinho_bacia = formar_bacias(
+        centroides['lat'].to_numpy()[linhas], centroides['lon'].to_numpy()[linhas],
+        populacao[com_centroide], df['Score_Realista'].to_numpy()[com_centroide],
+        franquia[com_centroide], sofazinho[com_centroide], distancia_km, score_sofazinho
+    )
+
+    codigos = df['Codigo_IBGE'].to_numpy(dtype=np.int64)
+    codigo_polo = np.zeros(len(df), dtype=np.int64)
+    codigo_polo[com_centroide] = np.where(polo >= 0, codigos[com_centroide][np.maximum(polo, 0)], 0)
+    papel_completo = np.full(len(df), SEM_BACIA, dtype=np.int8)
+    papel_completo[com_centroide] = papel
+    sofazinho_final = sofazinho.astype(np.int64)
+    sofazinho_final[com_centroide] = sofazinho_bacia
+
+    # População somada na bacia (no polo e na cidade com franquia, com os municípios que atende)
+    populacao_bacia = pd.Series(populacao).groupby(codigo_polo).transform('sum').to_numpy()
+    populacao_bacia = np.where(codigo_polo == codigos, populacao_bacia, 0).astype(np.int64)
+
+    return pd.DataFrame({
+        'Codigo_IBGE': codigos,
+        'Municipio': df['Municipio'].to_numpy(),
+        'Codigo_Polo': codigo_polo,
+        'Papel_Bacia': pd.Categorical.from_codes(papel_completo, categories=PAPEIS),
+        'Populacao_Bacia': populacao_bacia,
+        'Franquias_Sofazinho': sofazinho.astype(np.int64),
+        'Franquias_Sofazinho_Bacia': sofazinho_final
+    }, index=df.index)
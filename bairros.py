@@ -0,0 +1,189 @@
+"""
+Base de Bairros - Sofá Novo de Novo
+Franquias atuais e bairros candidatos por município, lidos de dados/bairros/
+
+cidades.csv      centro e zoom do mapa, arquivo de população por bairro (opcional)
+franquias.csv    franquias em operação (bairro, zona, coordenadas)
+candidatos.csv   bairros candidatos (score, população estimada, renda, motivo)
+
+Uma cidade nova entra só com linhas nesses arquivos; a aba de bairros lista
+todo município com potencial de MIN_POTENCIAL+ franquias padrão.
+"""
+
+import bisect
+import difflib
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+import espacial
+from geografia import UFS, codigo_uf
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+DIRETORIO_BAIRROS = os.path.join(RAIZ, 'dados', 'bairros')
+
+# Potencial mínimo de franquias padrão para o município aparecer na aba
+MIN_POTENCIAL = 5
+
+# Similaridade mínima (0-1, difflib) para aceitar um nome aproximado
+SIMILARIDADE_MINIMA = 0.85
+
+# Franquias a até esta distância de um candidato disputam o mesmo público
+RAIO_CANIBALIZACAO_KM = 3.0
+
+# Ordem de exibição das zonas; as demais vêm depois, em ordem alfabética
+ORDEM_ZONAS = ['Centro', 'Zona Sul', 'Zona Oeste', 'Zona Norte', 'Zona Leste']
+
+
+def carregar_populacao(arquivo):
+    """População por bairro (ex.: SEADE, colunas REGIÃO e 2023); None se não existir"""
+    try:
+        return pd.read_csv(os.path.join(RAIZ, arquivo))
+    except OSError:
+        return None
+
+
+def normalizar_nome(nome):
+    """Chave de busca: sem acentos, minúsculas e espaços simples ("Moóca" -> "mooca")"""
+    decomposto = unicodedata.normalize('NFKD', str(nome))
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.casefold().split())
+
+
+def indexar_populacao(df_populacao):
+    """Índice nome normalizado -> população 2023 (vale a primeira região com o nome)"""
+    populacao = {}
+    for regiao, valor in zip(df_populacao['REGIÃO'], df_populacao['2023']):
+        if pd.notna(regiao) and pd.notna(valor):
+            populacao.setdefault(normalizar_nome(regiao), int(valor))
+    return {'populacao': populacao, 'chaves': sorted(populacao)}
+
+
+def populacao_real(indice, nome_bairro):
+    """População pelo nome: exato, depois prefixo de palavra, depois aproximado; None se não achar"""
+    chave = normalizar_nome(nome_bairro)
+    populacao = indice['populacao']
+    if chave in populacao:
+        return populacao[chave]
+
+    # Prefixo só em fronteira de palavra ("Saúde" acha "Saúde Sul", "Bel" não acha "Bela Vista");
+    # entre vários, o nome mais curto e depois o alfabético
+    chaves = indice['chaves']
+    prefixados = chaves[bisect.bisect_left(chaves, chave + ' '):bisect.bisect_left(chaves, chave + '!')]
+    if prefixados:
+        return populacao[min(prefixados, key=len)]
+
+    aproximados = difflib.get_close_matches(chave, chaves, n=1, cutoff=SIMILARIDADE_MINIMA)
+    return populacao[aproximados[0]] if aproximados else None
+
+
+def populacoes_reais(indice, nomes):
+    """populacao_real para uma lista de nomes (None onde não há nome ou não achou)"""
+    return [None if pd.isna(nome) or not nome else populacao_real(indice, nome) for nome in nomes]
+
+
+def _ordenar_zonas(zonas):
+    """Zonas conhecidas na ordem de ORDEM_ZONAS, depois as demais"""
+    return sorted(zonas, key=lambda zona: (
+        ORDEM_ZONAS.index(zona) if zona in ORDEM_ZONAS else len(ORDEM_ZONAS), zona
+    ))
+
+
+def _relacionar_franquias(franquias_cidade, candidatos_cidade):
+    """Franquia mais próxima, distância e franquias no raio de canibalização de cada candidato"""
+    indice = espacial.indexar([f['lat'] for f in franquias_cidade], [f['lon'] for f in franquias_cidade])
+    lat = [c['lat'] for c in candidatos_cidade]
+    lon = [c['lon'] for c in candidatos_cidade]
+
+    posicoes, distancias = espacial.mais_proximo(indice, lat, lon)
+    no_raio = espacial.contar_no_raio(indice, lat, lon, RAIO_CANIBALIZACAO_KM)
+    for candidato, posicao, distancia, quantas in zip(candidatos_cidade, posicoes, distancias, no_raio):
+        candidato['franquia_proxima'] = franquias_cidade[posicao]['bairro'] if posicao >= 0 else None
+        candidato['distancia_franquia_km'] = round(float(distancia), 1) if np.isfinite(distancia) else None
+        candidato['franquias_no_raio'] = int(quantas)
+
+
+def _aplicar_pontuacao(candidatos_cidade, pontuados_cidade):
+    """Score, população e renda calculados (setores.py) nos candidatos cujo bairro tem setores"""
+    por_chave = {linha['chave']: linha for linha in pontuados_cidade.to_dict('records')}
+    for candidato in candidatos_cidade:
+        linha = por_chave.get(normalizar_nome(candidato['bairro']))
+        candidato['score_calculado'] = linha is not None
+        if linha is not None:
+            candidato['score'] = int(linha['score'])
+            candidato['populacao'] = int(linha['populacao'])
+            candidato['renda_media'] = int(round(linha['renda_media']))
+    candidatos_cidade.sort(key=lambda candidato: -candidato['score'])
+
+
+def carregar_base(diretorio=DIRETORIO_BAIRROS, bairros_pontuados=None):
+    """Dados de bairros por código IBGE do município; bairros_pontuados (setores.py) substitui os scores digitados"""
+    cidades = pd.read_csv(os.path.join(diretorio, 'cidades.csv'))
+    franquias = pd.read_csv(os.path.join(diretorio, 'franquias.csv'))
+
+    # Candidatos do maior score para o menor: as listas já saem ordenadas
+    candidatos = pd.read_csv(os.path.join(diretorio, 'candidatos.csv')).sort_values(
+        ['Codigo_IBGE', 'score'], ascending=[True, False], kind='stable'
+    )
+
+    base = {}
+    for cidade in cidades.itertuples(index=False):
+        codigo = int(cidade.Codigo_IBGE)
+        df_populacao = carregar_populacao(cidade.arquivo_populacao) if pd.notna(cidade.arquivo_populacao) else None
+        indice = None if df_populacao is None else indexar_populacao(df_populacao)
+
+        franquias_cidade = franquias[franquias['Codigo_IBGE'] == codigo].drop(columns='Codigo_IBGE')
+        franquias_cidade = franquias_cidade.to_dict('records')
+
+        candidatos_cidade = candidatos[candidatos['Codigo_IBGE'] == codigo].drop(columns='Codigo_IBGE')
+        candidatos_cidade = candidatos_cidade.to_dict('records')
+
+        # População real quando a cidade tem arquivo e o bairro é encontrado; senão, a estimativa
+        nomes_populacao = [candidato.pop('nome_populacao') for candidato in candidatos_cidade]
+        if indice is not None:
+            for candidato, real in zip(candidatos_cidade, populacoes_reais(indice, nomes_populacao)):
+                candidato['populacao'] = real or candidato['populacao']
+
+        if bairros_pontuados is not None:
+            _aplicar_pontuacao(candidatos_cidade, bairros_pontuados[bairros_pontuados['Codigo_IBGE'] == codigo])
+
+        _relacionar_franquias(franquias_cidade, candidatos_cidade)
+
+        zonas = _ordenar_zonas({item['zona'] for item in franquias_cidade + candidatos_cidade})
+        base[codigo] = {
+            'municipio': cidade.municipio,
+            'centro': {'lat': float(cidade.lat), 'lon': float(cidade.lon)},
+            'zoom': int(cidade.zoom),
+            'franquias': franquias_cidade,
+            'candidatos': candidatos_cidade,
+            'zonas': {
+                zona: {
+                    'franquias': [f for f in franquias_cidade if f['zona'] == zona],
+                    'candidatos': [c for c in candidatos_cidade if c['zona'] == zona]
+                }
+                for zona in zonas
+            },
+            'distritos': None if df_populacao is None else len(df_populacao)
+        }
+    return base
+
+
+def cidades_elegiveis(df, coluna_potencial=None):
+    """'Município-UF' -> código, potencial e franquias atuais; do maior potencial ao menor"""
+    # Sem coluna informada: potencial corrigido se a base tiver, senão o realista
+    if coluna_potencial is None:
+        coluna_potencial = 'Franquias_Padrao_Corrigida' if 'Franquias_Padrao_Corrigida' in df.columns \
+            else 'Franquias_Padrao_Realista'
+    elegiveis = df.loc[
+        df[coluna_potencial] >= MIN_POTENCIAL, ['Codigo_IBGE', 'Municipio', 'Franquias_Atuais', coluna_potencial]
+    ].sort_values(coluna_potencial, ascending=False, kind='stable')
+
+    return {
+        f"{municipio}-{UFS[int(uf)][0]}": {'codigo': int(codigo), 'potencial': int(potencial), 'atuais': int(atuais)}
+        for codigo, municipio, atuais, potencial, uf in zip(
+            elegiveis['Codigo_IBGE'], elegiveis['Municipio'], elegiveis['Franquias_Atuais'].fillna(0),
+            elegiveis[coluna_potencial], codigo_uf(elegiveis['Codigo_IBGE'])
+        )
+    }
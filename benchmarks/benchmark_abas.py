@@ -0,0 +1,79 @@
+"""
+Benchmark de Rerun por Interação - Sofá Novo de Novo
+Latência do rerun após mudar um widget de cada aba (AppTest, sem navegador)
+
+Uso: python benchmarks/benchmark_abas.py [dashboard.py] [repeticoes]
+
+Cada interação alterna entre dois valores para que todo rerun seja uma
+mudança real. O AppTest reexecuta o script inteiro: widgets dentro de
+fragmentos rodam ainda menos no navegador do que o medido aqui.
+"""
+
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (aba, tipo do widget, rótulo, valor alternativo)
+INTERACOES = [
+    ("🗺️ Mapas", "selectbox", "Métrica para visualizar:", 1),
+    ("📈 Análise Completa", "selectbox", "Filtrar por Região:", "Sudeste"),
+    ("📈 Análise Completa", "slider", "População mínima (mil hab):", 100),
+    ("📈 Análise Completa", "number_input", "Página:", 2),
+    ("📈 Análise Completa", "selectbox", "Ordenar por:", 3),
+    ("💡 Insights Estratégicos", "select_slider", "Simulações:", 5000),
+    ("💰 Receita Franqueadora", "number_input", "Royalty Franquia Padrão:", 1499),
+    ("💰 Receita Franqueadora", "slider", "Anos para projeção:", 8),
+    ("💰 Receita Franqueadora", "slider", "Churn Anual (%):", 10.0),
+    ("🏙️ Análise por Bairros", "selectbox", "Escolha a cidade:", "Rio de Janeiro-RJ"),
+    ("🏙️ Análise por Bairros", "slider", "Score mínimo:", 80),
+]
+
+
+def _widget(at, tipo, rotulo):
+    """Localiza o widget pelo rótulo (funciona com ou sem key)"""
+    return next(w for w in getattr(at, tipo) if w.label == rotulo)
+
+
+def medir(caminho_app, aba, tipo, rotulo, valor, repeticoes):
+    """Mediana (ms) do rerun após alternar o widget entre o valor inicial e o novo"""
+    at = AppTest.from_file(caminho_app, default_timeout=120)
+    at.session_state["aba_ativa"] = aba  # Abas com estado abrem na aba medida
+    at.run()
+
+    widget = _widget(at, tipo, rotulo)
+    if tipo == "selectbox" and isinstance(valor, int):
+        valor = widget.options[valor]
+    valores = [valor, widget.value]
+
+    tempos = []
+    for i in range(repeticoes):
+        _widget(at, tipo, rotulo).set_value(valores[i % 2])
+        inicio = time.perf_counter()
+        at.run()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return statistics.median(tempos)
+
+
+def main():
+    """Imprime a latência de rerun por interação"""
+    caminho_app = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else \
+        os.path.join(RAIZ, "dashboard_corrigido_final.py")
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    os.chdir(os.path.dirname(caminho_app))
+
+    print(f"App: {caminho_app} | repetições: {repeticoes}")
+    print(f"{'Aba':<26}{'Widget':<32}{'Rerun (ms)':>12}")
+    for aba, tipo, rotulo, valor in INTERACOES:
+        tempo = medir(caminho_app, aba, tipo, rotulo, valor, repeticoes)
+        print(f"{aba:<26}{rotulo:<32}{tempo:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
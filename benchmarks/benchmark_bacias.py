@@ -0,0 +1,108 @@
+"""
+Benchmark das Bacias de Atendimento - Sofá Novo de Novo
+Bacias de todos os municípios do país em um único lote
+
+Uso: python benchmarks/benchmark_bacias.py [distancia_km]
+
+Usa a base de análise com os centroides da malha local quando ela existe
+(python malhas.py); senão, centroides sintéticos agrupados em torno de
+capitais fictícias. Também mede a base replicada (porte do país inteiro e
+10x), confere a regra "atendido por franquia" contra a matriz de
+distâncias completa e que cidades com franquia mantêm o próprio sofázinho.
+"""
+
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import bacias
+import espacial
+import snapshot_dados
+
+
+def centroides_sinteticos(codigos, rng):
+    """Municípios espalhados em torno de 27 centros no território brasileiro"""
+    centros = np.column_stack((rng.uniform(-30, -3, 27), rng.uniform(-60, -38, 27)))
+    grupo = rng.integers(0, 27, len(codigos))
+    return pd.DataFrame({
+        'Codigo_IBGE': codigos,
+        'lat': centros[grupo, 0] + rng.normal(0, 1.5, len(codigos)),
+        'lon': centros[grupo, 1] + rng.normal(0, 1.5, len(codigos))
+    })
+
+
+def replicar(df, vezes):
+    """Base replicada com códigos novos (mesmas proporções de franquias e sofázinhos)"""
+    copias = [df.assign(Codigo_IBGE=df['Codigo_IBGE'] + 10_000_000 * i) for i in range(vezes)]
+    return pd.concat(copias, ignore_index=True)
+
+
+def confere_atendidos(df, centroides, resultado, distancia_km):
+    """Força bruta: todo município sem franquia a até o raio de uma cidade com franquia está atendido"""
+    posicao = pd.Index(centroides['Codigo_IBGE']).get_indexer(df['Codigo_IBGE'])
+    lat, lon = centroides['lat'].to_numpy()[posicao], centroides['lon'].to_numpy()[posicao]
+    franquia = (df[bacias.colunas_alocacao(df)[0]].to_numpy() > 0) | (df['Franquias_Atuais'].fillna(0).to_numpy() > 0)
+
+    esperado = np.zeros(len(df), dtype=bool)
+    sem_franquia = np.flatnonzero(~franquia)
+    for inicio in range(0, len(sem_franquia), 1000):
+        bloco = sem_franquia[inicio:inicio + 1000]
+        distancias = espacial.distancia_km(
+            np.repeat(lat[bloco], franquia.sum()), np.repeat(lon[bloco], franquia.sum()),
+            np.tile(lat[franquia], len(bloco)), np.tile(lon[franquia], len(bloco))
+        ).reshape(len(bloco), -1)
+        esperado[bloco] = distancias.min(axis=1) <= distancia_km / bacias.FATOR_ROTA
+    return np.array_equal(esperado, (resultado['Papel_Bacia'] == 'Atendido por franquia').to_numpy())
+
+
+def confere_sofazinhos_mantidos(df, resultado):
+    """Cidade com franquia que também tem sofázinho continua com ele"""
+    coluna_padrao, coluna_sofazinho = bacias.colunas_alocacao(df)
+    franquia = (df[coluna_padrao].to_numpy() > 0) | (df['Franquias_Atuais'].fillna(0).to_numpy() > 0)
+    mantidos = franquia & (df[coluna_sofazinho].to_numpy() > 0)
+    return bool((resultado['Franquias_Sofazinho_Bacia'].to_numpy()[mantidos] == 1).all())
+
+
+def main():
+    """Tempo por tamanho de base e resumo da realocação"""
+    distancia_km = float(sys.argv[1]) if len(sys.argv) > 1 else bacias.DISTANCIA_BACIA_KM
+    rng = np.random.default_rng(42)
+    caminho_csv = max(glob.glob(os.path.join(RAIZ, "analise_corrigida_faturamento_*.csv")))
+    df = snapshot_dados.para_pandas(snapshot_dados.ler_csv(caminho_csv))
+
+    centroides = bacias.centroides_municipios()
+    origem = "sintéticos" if centroides is None else "malha local"
+
+    print(f"Distância de carro: {distancia_km:.0f} km (linha reta {distancia_km / bacias.FATOR_ROTA:.1f} km) | "
+          f"centroides: {origem}")
+    print(f"{'Municípios':>11}{'Tempo (ms)':>12}{'Sofázinhos antes':>18}{'depois':>8}"
+          f"{'Atendidos':>11}{'Bacias novas':>14}{'Confere':>9}")
+    for vezes in (1, 3, 10):
+        base = replicar(df, vezes)
+        if centroides is None or vezes > 1:
+            centroides_base = centroides_sinteticos(base['Codigo_IBGE'].to_numpy(), rng)
+        else:
+            centroides_base = centroides
+
+        inicio = time.perf_counter()
+        resultado = bacias.bacias_municipios(base, centroides_base, distancia_km)
+        tempo = (time.perf_counter() - inicio) * 1000
+
+        antes = int(resultado['Franquias_Sofazinho'].sum())
+        depois = int(resultado['Franquias_Sofazinho_Bacia'].sum())
+        atendidos = int((resultado['Papel_Bacia'] == 'Atendido por franquia').sum())
+        novas = int(((resultado['Papel_Bacia'] == 'Polo') & (resultado['Franquias_Sofazinho'] == 0)).sum())
+        confere = "sim" if confere_atendidos(base, centroides_base, resultado, distancia_km) and \
+            confere_sofazinhos_mantidos(base, resultado) else "NÃO"
+        print(f"{len(base):>11,}{tempo:>12.0f}{antes:>18,}{depois:>8,}{atendidos:>11,}{novas:>14,}{confere:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Teste de Carga - Sofá Novo de Novo
+N sessões simultâneas (AppTest, sem navegador) seguindo um roteiro de uso
+
+Uso: python benchmarks/benchmark_carga.py [dashboard.py] [sessoes] [rodadas]
+
+Cada sessão roda em sua própria thread, no mesmo processo, como os usuários
+de um servidor Streamlit: troca de abas, filtros da aba 4, simulador da aba 7
+e cidades da aba 8, com valores sorteados (semente por sessão). Latência =
+tempo do rerun; memória = RSS do processo logo após cada interação.
+"""
+
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import streamlit
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (tipo de interação, aba, tipo do widget, rótulo); widget None = só troca de aba
+ROTEIRO = [
+    ("Trocar aba", "📊 Visão Geral", None, None),
+    ("Trocar aba", "🏢 Franquias Atuais", None, None),
+    ("Trocar aba", "🗺️ Mapas", None, None),
+    ("Trocar aba", "📈 Análise Completa", None, None),
+    ("Filtros (aba 4)", "📈 Análise Completa", "selectbox", "Filtrar por Região:"),
+    ("Filtros (aba 4)", "📈 Análise Completa", "slider", "População mínima (mil hab):"),
+    ("Trocar aba", "🧮 Base de Cálculo", None, None),
+    ("Trocar aba", "💡 Insights Estratégicos", None, None),
+    ("Trocar aba", "💰 Receita Franqueadora", None, None),
+    ("Simulador (aba 7)", "💰 Receita Franqueadora", "number_input", "Royalty Franquia Padrão:"),
+    ("Simulador (aba 7)", "💰 Receita Franqueadora", "slider", "Anos para projeção:"),
+    ("Simulador (aba 7)", "💰 Receita Franqueadora", "slider", "Churn Anual (%):"),
+    ("Trocar aba", "🏙️ Análise por Bairros", None, None),
+    ("Cidade (aba 8)", "🏙️ Análise por Bairros", "selectbox", "Escolha a cidade:"),
+]
+
+PERCENTIS = (50, 95, 99)
+
+
+# Versão do Streamlit em que os ajustes abaixo foram escritos e conferidos
+VERSAO_STREAMLIT = "1.65"
+
+# O AppTest foi feito para uma sessão por processo. Para sessões simultâneas,
+# como no servidor: um único cache de bytecode (o AppTest recompila a cada run,
+# e compile() em threads simultâneas falha no Python 3.11) e um único runtime
+# instalado enquanto houver run em andamento (o AppTest o remove ao terminar).
+# São internos do Streamlit: outra versão ou atributo ausente interrompe o teste
+# em vez de medir algo diferente sem avisar.
+if not streamlit.__version__.startswith(VERSAO_STREAMLIT + "."):
+    sys.exit(f"benchmark_carga.py foi escrito para o Streamlit {VERSAO_STREAMLIT}.x "
+             f"(instalado: {streamlit.__version__}); confira os ajustes do AppTest antes de usar.")
+for modulo, atributo in ((app_test, 'ScriptCache'), (local_script_runner, 'ScriptCache'), (app_test, 'Runtime')):
+    if not hasattr(modulo, atributo):
+        sys.exit(f"benchmark_carga.py: {modulo.__name__}.{atributo} não existe nesta versão do Streamlit")
+if '_instance' not in vars(Runtime):
+    sys.exit("benchmark_carga.py: Runtime._instance não existe nesta versão do Streamlit")
+
+_CACHE_SCRIPT = ScriptCache()
+app_test.ScriptCache = local_script_runner.ScriptCache = lambda: _CACHE_SCRIPT
+
+
+class _RuntimeCompartilhado(type):
+    """Conta os runs ativos e mantém o primeiro runtime simulado até o último terminar"""
+
+    ativos = 0
+    trava = threading.Lock()
+
+    def __setattr__(cls, nome, valor):
+        if nome != '_instance':
+            return super().__setattr__(nome, valor)
+        with _RuntimeCompartilhado.trava:
+            if valor is None:
+                _RuntimeCompartilhado.ativos -= 1
+                if _RuntimeCompartilhado.ativos == 0:
+                    Runtime._instance = None
+            else:
+                _RuntimeCompartilhado.ativos += 1
+                if Runtime._instance is None:
+                    Runtime._instance = valor
+
+
+class _Runtime(Runtime, metaclass=_RuntimeCompartilhado):
+    """Runtime visto pelo AppTest (mesma interface; a instância fica no Runtime real)"""
+
+
+app_test.Runtime = _Runtime
+
+
+def _widget(at, tipo, rotulo):
+    """Localiza o widget pelo rótulo (funciona com ou sem key)"""
+    return next(w for w in getattr(at, tipo) if w.label == rotulo)
+
+
+def _valor_sorteado(widget, tipo, sorteio):
+    """Valor válido diferente do atual: opção do selectbox ou passo do intervalo"""
+    if tipo == "selectbox":
+        candidatos = list(widget.options)
+    else:
+        passos = int(round((widget.max - widget.min) / widget.step))
+        candidatos = [widget.min + i * widget.step for i in range(passos + 1)]
+        if isinstance(widget.value, int):
+            candidatos = [int(round(c)) for c in candidatos]
+    candidatos = [c for c in candidatos if c != widget.value] or candidatos
+    return sorteio.choice(candidatos)
+
+
+def _memoria_mb():
+    """RSS atual do processo (MB); pico do processo onde /proc não existe"""
+    try:
+        with open('/proc/self/statm') as arquivo:
+            paginas = int(arquivo.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except OSError:
+        return _pico_processo_mb()
+
+
+def _pico_processo_mb():
+    """Pico de RSS do processo (MB); o Linux informa em KB e o macOS em bytes"""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+
+def sessao(caminho_app, semente, rodadas, barreira):
+    """Executa o roteiro `rodadas` vezes; devolve [(tipo, latência ms, RSS MB)]"""
+    sorteio = random.Random(semente)
+    at = AppTest.from_file(caminho_app, default_timeout=300)
+    at.run()
+    barreira.wait()  # Todas as sessões abertas antes de medir
+
+    medicoes = []
+    for _ in range(rodadas):
+        for tipo, aba, tipo_widget, rotulo in ROTEIRO:
+            # O navegador sempre envia a aba aberta; o AppTest só a mantém se for informada
+            at.session_state["aba_ativa"] = aba
+            if tipo_widget is not None:
+                widget = _widget(at, tipo_widget, rotulo)
+                widget.set_value(_valor_sorteado(widget, tipo_widget, sorteio))
+
+            inicio = time.perf_counter()
+            at.run()
+            latencia = (time.perf_counter() - inicio) * 1000
+            if at.exception:
+                raise RuntimeError(f"{tipo} ({rotulo or aba}): {at.exception[0].value}")
+            medicoes.append((tipo, latencia, _memoria_mb()))
+    return medicoes
+
+
+def executar(caminho_app, n_sessoes, rodadas):
+    """Roda as sessões em paralelo; devolve as medições agrupadas por tipo e o tempo total"""
+    barreira = threading.Barrier(n_sessoes)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessoes) as executor:
+        tarefas = [
+            executor.submit(sessao, caminho_app, semente, rodadas, barreira)
+            for semente in range(n_sessoes)
+        ]
+        medicoes = [m for tarefa in tarefas for m in tarefa.result()]
+    duracao = time.perf_counter() - inicio
+
+    por_tipo = defaultdict(lambda: ([], []))
+    for tipo, latencia, memoria in medicoes:
+        por_tipo[tipo][0].append(latencia)
+        por_tipo[tipo][1].append(memoria)
+    return por_tipo, duracao
+
+
+def main():
+    """Imprime percentis de latência e memória por tipo de interação"""
+    caminho_app = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else \
+        os.path.join(RAIZ, "dashboard_corrigido_final.py")
+    n_sessoes = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rodadas = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    os.chdir(os.path.dirname(caminho_app))
+
+    # Aquece imports e caches do processo, como um servidor já no ar
+    executar(caminho_app, 1, 1)
+    memoria_inicial = _memoria_mb()
+
+    por_tipo, duracao = executar(caminho_app, n_sessoes, rodadas)
+
+    total = sum(len(latencias) for latencias, _ in por_tipo.values())
+    print(f"App: {caminho_app}")
+    print(f"Sessões: {n_sessoes} | rodadas: {rodadas} | reruns: {total} | "
+          f"duração: {duracao:.1f} s ({total / duracao:.1f} reruns/s)")
+    print(f"{'Interação':<20}{'N':>6}" + "".join(f"{f'p{p} (ms)':>12}" for p in PERCENTIS) +
+          f"{'Pico RSS (MB)':>16}")
+    for tipo in dict.fromkeys(tipo for tipo, *_ in ROTEIRO):
+        latencias, memorias = por_tipo[tipo]
+        percentis = np.percentile(latencias, PERCENTIS)
+        print(f"{tipo:<20}{len(latencias):>6}" + "".join(f"{p:>12.0f}" for p in percentis) +
+              f"{max(memorias):>16.0f}")
+    pico = max(max(memorias) for _, memorias in por_tipo.values())
+    print(f"RSS após aquecimento: {memoria_inicial:.0f} MB | pico com as sessões: {pico:.0f} MB "
+          f"(+{pico - memoria_inicial:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
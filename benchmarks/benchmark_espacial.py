@@ -0,0 +1,80 @@
+"""
+Benchmark do Índice Espacial - Sofá Novo de Novo
+Franquia mais próxima, 5 mais próximas e franquias no raio: índice em grade vs matriz de distâncias
+
+Uso: python benchmarks/benchmark_espacial.py [raio_km]
+
+Franquias e candidatos sintéticos na extensão da cidade de São Paulo. A
+força bruta calcula a matriz haversine completa (em blocos) e serve de
+referência: os resultados do índice precisam ser idênticos.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import espacial
+
+# Acima disso a força bruta fica lenta demais para repetir no benchmark
+MAX_PARES_FORCA_BRUTA = 50_000_000
+
+
+def forca_bruta(lat, lon, lat_consulta, lon_consulta, raio_km, k=5):
+    """Matriz de distâncias por blocos: mais próxima, k mais próximas e contagem no raio"""
+    xyz = espacial._unitarios(lat, lon)
+    proximas, distancias, no_raio = [], [], []
+    for inicio in range(0, len(lat_consulta), 1000):
+        consulta = espacial._unitarios(lat_consulta[inicio:inicio + 1000], lon_consulta[inicio:inicio + 1000])
+        corda2 = np.maximum(2 - 2 * consulta @ xyz.T, 0)
+        matriz = espacial._distancia(corda2)
+        ordem = np.argsort(matriz, axis=1, kind='stable')[:, :k]
+        proximas.append(ordem)
+        distancias.append(np.take_along_axis(matriz, ordem, axis=1))
+        no_raio.append((matriz <= raio_km).sum(axis=1))
+    return np.vstack(proximas), np.vstack(distancias), np.concatenate(no_raio)
+
+
+def pelo_indice(lat, lon, lat_consulta, lon_consulta, raio_km, k=5):
+    """Mesmas consultas pelo índice espacial (inclui a construção do índice)"""
+    indice = espacial.indexar(lat, lon)
+    proximas, distancias = espacial.k_mais_proximos(indice, lat_consulta, lon_consulta, k)
+    return proximas, distancias, espacial.contar_no_raio(indice, lat_consulta, lon_consulta, raio_km)
+
+
+def main():
+    """Compara tempos e confere os resultados para cidades de 26 a 5 mil franquias"""
+    raio_km = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    rng = np.random.default_rng(42)
+
+    print(f"Raio: {raio_km:.1f} km | k = 5")
+    print(f"{'Franquias':>10}{'Candidatos':>12}{'Índice (ms)':>14}{'Força bruta (ms)':>18}{'Iguais':>8}")
+    for n_franquias, n_candidatos in ((26, 20), (500, 5_000), (5_000, 50_000)):
+        lat = rng.uniform(-23.80, -23.40, n_franquias)
+        lon = rng.uniform(-46.82, -46.40, n_franquias)
+        lat_consulta = rng.uniform(-23.80, -23.40, n_candidatos)
+        lon_consulta = rng.uniform(-46.82, -46.40, n_candidatos)
+
+        inicio = time.perf_counter()
+        resultado = pelo_indice(lat, lon, lat_consulta, lon_consulta, raio_km)
+        tempo_indice = (time.perf_counter() - inicio) * 1000
+
+        if n_franquias * n_candidatos <= MAX_PARES_FORCA_BRUTA:
+            inicio = time.perf_counter()
+            referencia = forca_bruta(lat, lon, lat_consulta, lon_consulta, raio_km)
+            tempo_bruto = f"{(time.perf_counter() - inicio) * 1000:>18.0f}"
+            # Distâncias iguais até 1 m (a matriz por produto escalar perde precisão em distâncias curtas)
+            iguais = np.allclose(resultado[1], referencia[1], rtol=0, atol=1e-3) and \
+                np.array_equal(resultado[2], referencia[2])
+            iguais = "sim" if iguais else "NÃO"
+        else:
+            tempo_bruto, iguais = f"{'-':>18}", "-"
+        print(f"{n_franquias:>10,}{n_candidatos:>12,}{tempo_indice:>14.1f}{tempo_bruto}{iguais:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark de Formatação - Sofá Novo de Novo
+Tabela de ranking completa (aba Análise Completa): texto por célula vs formato no navegador
+
+Uso: python benchmarks/benchmark_formatacao.py [arquivo.csv] [repeticoes]
+"""
+
+import glob
+import os
+import statistics
+import sys
+import time
+
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import snapshot_dados
+from formatacao import configurar_colunas
+from metricas_negocio import criar_justificativas
+from modelo_score import recalcular_colunas
+
+COLUNAS_RANKING = [
+    'Ranking_Corrigido', 'Municipio', 'UF', 'Populacao_2022',
+    'Classe_AB_PNAD', 'Pop_Classe_AB', 'Mercado_Total_Servicos',
+    'Franquias_Atuais', 'Franquias_Padrao_Adicional_Corrigida',
+    'Franquias_Sofazinho_Adicional_Corrigida', 'Total_Franquias_Adicional_Corrigida',
+    'Total_Franquias_Corrigida', 'Faturamento_Mensal_Estimado',
+    'Payback_Meses', 'Tipo_Recomendado', 'Classificacao_Corrigida', 'Justificativa'
+]
+
+
+def formatar_texto(tabela):
+    """Formatação anterior: uma chamada Python por célula, colunas viram texto"""
+    tabela = tabela.copy()
+    tabela['Populacao_2022'] = tabela['Populacao_2022'].apply(lambda x: f"{x:,}")
+    tabela['Pop_Classe_AB'] = tabela['Pop_Classe_AB'].apply(lambda x: f"{x:,}")
+    tabela['Mercado_Total_Servicos'] = tabela['Mercado_Total_Servicos'].apply(lambda x: f"{x:,}")
+    tabela['Classe_AB_PNAD'] = tabela['Classe_AB_PNAD'].apply(lambda x: f"{x:.1f}%")
+    tabela['Faturamento_Mensal_Estimado'] = tabela['Faturamento_Mensal_Estimado'].apply(
+        lambda x: f"R$ {x:,.0f}" if x > 0 else "R$ 0")
+    tabela['Payback_Meses'] = tabela['Payback_Meses'].apply(lambda x: f"{x:.1f} meses" if x > 0 else "N/A")
+    return tabela
+
+
+def formatar_numerico(tabela):
+    """Formatação atual: colunas numéricas e column_config declarado"""
+    tabela = tabela.assign(Payback_Meses=tabela['Payback_Meses'].where(tabela['Payback_Meses'] > 0))
+    configurar_colunas(tabela)
+    return tabela
+
+
+def medir(tabela, formatar, repeticoes):
+    """Mediana (ms) de formatar + serializar e tamanho do payload Arrow"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        payload = convert_pandas_df_to_arrow_bytes(formatar(tabela))
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), len(payload)
+
+
+def main():
+    """Compara as duas estratégias na tabela de ranking completa"""
+    if len(sys.argv) > 1:
+        caminho_csv = sys.argv[1]
+    else:
+        caminho_csv = max(glob.glob(os.path.join(RAIZ, "analise_corrigida_faturamento_*.csv")))
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    df = recalcular_colunas(snapshot_dados.para_pandas(snapshot_dados.ler_csv(caminho_csv)))
+    df['Justificativa'] = criar_justificativas(df)
+    tabela = df[COLUNAS_RANKING]
+
+    print(f"Tabela de ranking: {len(tabela):,} linhas x {len(tabela.columns)} colunas")
+    print(f"{'Estratégia':<28}{'Formatar + Arrow (ms)':>24}{'Payload (KB)':>14}")
+    for nome, formatar in (("Texto por célula", formatar_texto), ("Formato no navegador", formatar_numerico)):
+        tempo, tamanho = medir(tabela, formatar, repeticoes)
+        print(f"{nome:<28}{tempo:>24.2f}{tamanho / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark de Inicialização - Sofá Novo de Novo
+Tempo até a primeira renderização em um processo novo, com e sem artefato pré-gerado
+
+Uso: python benchmarks/benchmark_inicializacao.py [arquivo.csv]
+
+Cada cenário roda em um diretório temporário só com o CSV:
+- sem artefato: o primeiro acesso converte o CSV para o snapshot Arrow
+- pré-gerado: `python snapshot_dados.py reconstruir` roda antes (etapa de build)
+Base = pacotes que o servidor já carregou antes do script (streamlit, pandas,
+numpy, pyarrow); as demais etapas vêm do relatório de inicialização do app.
+"""
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAMINHO_APP = os.path.join(RAIZ, "dashboard_corrigido_final.py")
+
+# Executado em um Python novo: nenhum import ou cache aquecido
+MEDICAO = r"""
+import json, sys, time
+inicio = time.perf_counter()
+import numpy, pandas, pyarrow, streamlit
+base = time.perf_counter() - inicio
+
+sys.path.insert(0, {raiz!r})
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+if at.exception:
+    raise RuntimeError(at.exception[0].value)
+
+tempos = next(e for e in at.sidebar.expander if e.label == "⏱️ Inicialização").dataframe[0].value
+resultado = {{'Base': base * 1000}}
+resultado.update(zip(tempos['Etapa'], tempos['Primeira (ms)']))
+print(json.dumps(resultado))
+"""
+
+
+def medir(diretorio):
+    """Tempos (ms) da primeira execução do app em um processo novo"""
+    codigo = MEDICAO.format(raiz=RAIZ, app=CAMINHO_APP)
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=diretorio, capture_output=True,
+                           text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Imprime a decomposição do tempo de inicialização por cenário"""
+    if len(sys.argv) > 1:
+        caminho_csv = sys.argv[1]
+    else:
+        caminho_csv = max(glob.glob(os.path.join(RAIZ, "analise_corrigida_faturamento_*.csv")))
+
+    etapas = ['Base', 'Imports', 'Página', 'Dados', 'Renderização', 'Total']
+    print(f"Arquivo: {os.path.basename(caminho_csv)}")
+    print(f"{'Cenário':<16}" + "".join(f"{etapa + ' (ms)':>19}" for etapa in etapas))
+
+    for cenario in ("sem artefato", "pré-gerado"):
+        with tempfile.TemporaryDirectory() as diretorio:
+            shutil.copy(caminho_csv, diretorio)
+            if cenario == "pré-gerado":
+                subprocess.run([sys.executable, os.path.join(RAIZ, "snapshot_dados.py"), "reconstruir"],
+                               cwd=diretorio, capture_output=True, check=True)
+            tempos = medir(diretorio)
+        print(f"{cenario:<16}" + "".join(f"{tempos[etapa]:>19.0f}" for etapa in etapas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark do Otimizador de Localização - Sofá Novo de Novo
+Plano de K unidades em uma cidade do porte de São Paulo: guloso preguiçoso vs guloso completo
+
+Uso: python benchmarks/benchmark_localizacao.py [unidades] [raio_km]
+
+Demanda sintética no nível de setor censitário (~27 mil setores, domicílios
+A/B concentrados no centro expandido), locais candidatos nos centroides de
+bairro e as 26 franquias atuais. O guloso completo recalcula o ganho de todos
+os locais a cada escolha e serve de referência: a cobertura precisa ser igual.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import localizacao
+
+# Porte de São Paulo: setores censitários, bairros candidatos e franquias atuais
+N_SETORES = 27_000
+N_LOCAIS = 1_500
+N_EXISTENTES = 26
+CENTRO = (-23.55, -46.63)
+
+
+def cidade_sintetica(rng):
+    """Setores (lat, lon, domicílios A/B), locais candidatos e unidades existentes"""
+    def pontos(n, espalhamento):
+        return (CENTRO[0] + rng.normal(0, espalhamento, n), CENTRO[1] + rng.normal(0, espalhamento, n))
+
+    lat_setores, lon_setores = pontos(N_SETORES, 0.12)
+    distancia_centro = np.hypot(lat_setores - CENTRO[0], lon_setores - CENTRO[1])
+    domicilios_ab = rng.integers(50, 400, N_SETORES) * np.exp(-distancia_centro / 0.1)
+    return (lat_setores, lon_setores, domicilios_ab), pontos(N_LOCAIS, 0.12), pontos(N_EXISTENTES, 0.06)
+
+
+def guloso_completo(ponteiros, pontos, peso, k, coberto):
+    """Referência: ganho de todos os locais recalculado a cada escolha"""
+    coberto = coberto.copy()
+    local_do_par = np.repeat(np.arange(len(ponteiros) - 1), np.diff(ponteiros))
+    escolhidos = []
+    for _ in range(k):
+        ganhos = np.bincount(local_do_par, weights=np.where(coberto, 0, peso)[pontos],
+                             minlength=len(ponteiros) - 1)
+        melhor = int(np.argmax(ganhos))
+        if ganhos[melhor] <= 0:
+            break
+        escolhidos.append(melhor)
+        coberto[pontos[ponteiros[melhor]:ponteiros[melhor + 1]]] = True
+    return escolhidos, float(peso[coberto].sum())
+
+
+def main():
+    """Tempo do plano (índice + cobertura + guloso) e conferência com o guloso completo"""
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    raio_km = float(sys.argv[2]) if len(sys.argv) > 2 else localizacao.RAIO_ATENDIMENTO_KM
+    (lat, lon, peso), (lat_locais, lon_locais), (lat_existentes, lon_existentes) = \
+        cidade_sintetica(np.random.default_rng(42))
+
+    inicio = time.perf_counter()
+    plano = localizacao.planejar(lat, lon, peso, lat_locais, lon_locais, k,
+                                 lat_existentes, lon_existentes, raio_km)
+    tempo_plano = (time.perf_counter() - inicio) * 1000
+
+    coberto = localizacao.cobertos(lat, lon, lat_existentes, lon_existentes, raio_km)
+    ponteiros, pontos = localizacao.conjuntos_cobertura(lat, lon, lat_locais, lon_locais, raio_km)
+
+    inicio = time.perf_counter()
+    preguicoso, _ = localizacao.guloso_preguicoso(ponteiros, pontos, peso, k, coberto)
+    tempo_preguicoso = (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    completo, coberto_completo = guloso_completo(ponteiros, pontos, peso, k, coberto)
+    tempo_completo = (time.perf_counter() - inicio) * 1000
+
+    print(f"Setores: {N_SETORES:,} | locais: {N_LOCAIS:,} | existentes: {N_EXISTENTES} | "
+          f"K = {k} | raio: {raio_km:.1f} km | pares de cobertura: {len(pontos):,}")
+    print(f"Domicílios A/B cobertos: {plano['coberto_existentes'] / plano['total']:.1%} hoje -> "
+          f"{plano['coberto_plano'] / plano['total']:.1%} com o plano")
+    print(f"{'Etapa':<28}{'Tempo (ms)':>12}")
+    print(f"{'Plano completo':<28}{tempo_plano:>12.1f}")
+    print(f"{'Guloso preguiçoso':<28}{tempo_preguicoso:>12.1f}")
+    print(f"{'Guloso completo':<28}{tempo_completo:>12.1f}")
+    iguais = preguicoso == completo and np.isclose(plano['coberto_plano'], coberto_completo)
+    print(f"Mesmos locais e cobertura: {'sim' if iguais else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
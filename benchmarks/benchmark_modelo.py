@@ -0,0 +1,70 @@
+"""
+Benchmark do Modelo de Score - Sofá Novo de Novo
+Tempo do recálculo completo e divergências contra as colunas do arquivo offline
+
+Uso: python benchmarks/benchmark_modelo.py [arquivo.csv] [repeticoes]
+"""
+
+import glob
+import os
+import sys
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import snapshot_dados
+from modelo_score import calcular_modelo
+
+
+def divergencias(df, modelo):
+    """Linhas divergentes por coluna do modelo presente no arquivo"""
+    resultado = {}
+    for coluna in modelo.columns.intersection(df.columns):
+        recalculado, original = modelo[coluna], df[coluna]
+        if recalculado.dtype.kind == 'f':
+            iguais = np.isclose(recalculado.to_numpy(dtype=np.float64),
+                                original.to_numpy(dtype=np.float64), rtol=1e-6)
+        else:
+            iguais = recalculado.astype(object).to_numpy() == original.astype(object).to_numpy()
+        resultado[coluna] = int((~iguais).sum())
+    return resultado
+
+
+def medir(df, repeticoes):
+    """Mediana do tempo de recálculo em milissegundos"""
+    calcular_modelo(df)  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        calcular_modelo(df)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    """Valida o modelo e imprime o tempo por tamanho de base"""
+    if len(sys.argv) > 1:
+        caminho_csv = sys.argv[1]
+    else:
+        caminho_csv = max(glob.glob(os.path.join(RAIZ, "analise_corrigida_faturamento_*.csv")))
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    df = snapshot_dados.para_pandas(snapshot_dados.ler_csv(caminho_csv))
+
+    print(f"Arquivo: {os.path.basename(caminho_csv)} | {len(df):,} municípios")
+    for coluna, total in divergencias(df, calcular_modelo(df)).items():
+        print(f"{coluna:<42}{total:>6} divergência(s)")
+
+    print(f"{'Municípios':>12}{'Tempo (ms)':>14}")
+    for fator in (1, 3, 30):
+        base = pd.concat([df] * fator, ignore_index=True)
+        print(f"{len(base):>12,}{medir(base, repeticoes):>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark da Simulação Monte Carlo - Sofá Novo de Novo
+Tempo e pico de memória alocada por tamanho de lote
+
+Uso: python benchmarks/benchmark_monte_carlo.py [arquivo.csv] [simulacoes]
+"""
+
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import snapshot_dados
+import monte_carlo
+
+
+def medir(df, n_simulacoes, tamanho_lote):
+    """Tempo (s) e pico de memória (MB) de uma simulação completa"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = monte_carlo.simular(df, n_simulacoes, tamanho_lote=tamanho_lote)
+    tempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tempo, pico / 1024 ** 2, resultado['total']
+
+
+def main():
+    """Imprime tempo, memória e percentis do total por tamanho de lote"""
+    if len(sys.argv) > 1:
+        caminho_csv = sys.argv[1]
+    else:
+        caminho_csv = max(glob.glob(os.path.join(RAIZ, "analise_corrigida_faturamento_*.csv")))
+    n_simulacoes = int(sys.argv[2]) if len(sys.argv) > 2 else monte_carlo.SIMULACOES_PADRAO
+
+    df = snapshot_dados.para_pandas(snapshot_dados.ler_csv(caminho_csv))
+
+    print(f"Arquivo: {os.path.basename(caminho_csv)} | {len(df):,} municípios | {n_simulacoes:,} simulações")
+    print(f"{'Lote':>8}{'Tempo (s)':>12}{'Pico (MB)':>12}   P10 / P50 / P90")
+    for tamanho_lote in (100, 500, 2000):
+        tempo, pico, total = medir(df, n_simulacoes, tamanho_lote)
+        print(f"{tamanho_lote:>8,}{tempo:>12.2f}{pico:>12.1f}   "
+              f"{total['P10']:,} / {total['P50']:,} / {total['P90']:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark de Pontos - Sofá Novo de Novo
+Figura Scattermap (WebGL) com todos os pontos vs decimada em grade
+
+Uso: python benchmarks/benchmark_pontos.py [max_pontos]
+
+Pontos sintéticos na extensão do Brasil; mede o lado servidor (decimação,
+construção e serialização da figura) e o tamanho da especificação enviada.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from pontos import MAX_PONTOS, decimar_pontos
+
+
+def medir(lat, lon, score, max_pontos):
+    """Tempo (ms) de decimar + construir + serializar, pontos enviados e tamanho (KB)"""
+    inicio = time.perf_counter()
+    posicoes, contagem = decimar_pontos(lat, lon, score, max_pontos)
+    fig = go.Figure(go.Scattermap(
+        lat=lat[posicoes], lon=lon[posicoes], mode='markers',
+        marker=dict(size=6, color=score[posicoes]), customdata=contagem
+    ))
+    especificacao = pio.to_json(fig, validate=False)
+    return (time.perf_counter() - inicio) * 1000, len(posicoes), len(especificacao) / 1024
+
+
+def main():
+    """Compara envio integral e decimado para 5 mil a 500 mil pontos"""
+    max_pontos = int(sys.argv[1]) if len(sys.argv) > 1 else MAX_PONTOS
+    rng = np.random.default_rng(42)
+
+    medir(np.zeros(10), np.zeros(10), np.zeros(10), max_pontos)  # Aquece Plotly (validadores)
+
+    print(f"Limite de pontos: {max_pontos:,}")
+    print(f"{'Pontos':>10}{'Modo':>12}{'Tempo (ms)':>12}{'Enviados':>12}{'Spec (KB)':>12}")
+    for n in (5_000, 50_000, 500_000):
+        lat = rng.uniform(-33.7, 5.3, n)
+        lon = rng.uniform(-73.9, -34.8, n)
+        score = rng.uniform(60, 95, n)
+        for modo, limite in (("integral", n), ("decimado", max_pontos)):
+            tempo, enviados, tamanho = medir(lat, lon, score, limite)
+            print(f"{n:>10,}{modo:>12}{tempo:>12.0f}{enviados:>12,}{tamanho:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark de Memória por Sessão - Sofá Novo de Novo
+Memória retida por N sessões simultâneas (AppTest) no mesmo processo
+
+Uso: python benchmarks/benchmark_sessoes.py [dashboard.py] [sessoes ...]
+
+Todas as sessões ficam vivas até a medição, como navegadores abertos numa
+reunião; os caches do Streamlit são do processo e valem para todas elas.
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+from streamlit.testing.v1 import AppTest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def medir(caminho_app, n_sessoes):
+    """Memória Python alocada (MB) com n sessões abertas na aba inicial"""
+    gc.collect()
+    tracemalloc.start()
+    sessoes = []
+    for _ in range(n_sessoes):
+        at = AppTest.from_file(caminho_app, default_timeout=120)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        sessoes.append(at)
+
+    gc.collect()
+    atual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return atual / 1024 ** 2, pico / 1024 ** 2
+
+
+def main():
+    """Imprime a memória retida e o custo médio por sessão"""
+    caminho_app = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else \
+        os.path.join(RAIZ, "dashboard_corrigido_final.py")
+    lista_sessoes = [int(n) for n in sys.argv[2:]] or [1, 10, 50]
+    os.chdir(os.path.dirname(caminho_app))
+
+    # Aquece imports e caches do processo: a medição vê só o custo das sessões
+    medir(caminho_app, 1)
+
+    print(f"App: {caminho_app}")
+    print(f"{'Sessões':>8}{'Retida (MB)':>14}{'Pico (MB)':>12}{'Por sessão (MB)':>18}")
+    for n_sessoes in lista_sessoes:
+        retida, pico = medir(caminho_app, n_sessoes)
+        print(f"{n_sessoes:>8}{retida:>14.1f}{pico:>12.1f}{retida / n_sessoes:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark do Score por Setor - Sofá Novo de Novo
+Agregação e score de todos os bairros de várias cidades grandes em um único lote
+
+Uso: python benchmarks/benchmark_setores.py [setores] [municipios]
+
+Setores sintéticos (população, domicílios, classe A/B, renda, área e
+coordenadas) com nomes de bairro repetidos e grafias variadas (acentos,
+maiúsculas, espaços), como nas tabelas do Censo.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import setores
+
+# Bairros por município nos dados sintéticos
+BAIRROS_POR_MUNICIPIO = 150
+
+
+def setores_sinteticos(n_setores, n_municipios, rng):
+    """Tabela de setores no formato de setores.COLUNAS_SETORES"""
+    municipio = rng.integers(0, n_municipios, n_setores)
+    bairro = rng.integers(0, BAIRROS_POR_MUNICIPIO, n_setores)
+    grafias = np.array([f"Bairro {i} São" for i in range(BAIRROS_POR_MUNICIPIO)] +
+                       [f"bairro  {i} sao" for i in range(BAIRROS_POR_MUNICIPIO)], dtype=object)
+    domicilios = rng.integers(100, 600, n_setores)
+    return pd.DataFrame({
+        'Codigo_Setor': np.arange(n_setores),
+        'Codigo_IBGE': 3500000 + municipio,
+        'bairro': grafias[bairro + BAIRROS_POR_MUNICIPIO * rng.integers(0, 2, n_setores)],
+        'populacao': (domicilios * rng.uniform(2.5, 3.5, n_setores)).astype(np.int64),
+        'domicilios': domicilios,
+        'domicilios_ab': (domicilios * rng.uniform(0, 0.6, n_setores)).astype(np.int64),
+        'renda_total': domicilios * rng.uniform(1500, 15000, n_setores),
+        'area_km2': rng.uniform(0.05, 2.0, n_setores),
+        'lat': rng.uniform(-23.8, -23.4, n_setores),
+        'lon': rng.uniform(-46.8, -46.4, n_setores)
+    })
+
+
+def main():
+    """Tempo de agregação e de score para a tabela inteira"""
+    n_setores = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    n_municipios = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    df = setores_sinteticos(n_setores, n_municipios, np.random.default_rng(42))
+
+    inicio = time.perf_counter()
+    agregados = setores.agregar_bairros(df)
+    tempo_agregacao = (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    pontuados = setores.pontuar_bairros(agregados)
+    tempo_score = (time.perf_counter() - inicio) * 1000
+
+    print(f"Setores: {n_setores:,} | municípios: {n_municipios} | bairros: {len(pontuados):,}")
+    print(f"{'Etapa':<12}{'Tempo (ms)':>12}")
+    print(f"{'Agregação':<12}{tempo_agregacao:>12.0f}")
+    print(f"{'Score':<12}{tempo_score:>12.0f}")
+    print(f"{'Total':<12}{tempo_agregacao + tempo_score:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark de Carga a Frio - CSV vs Snapshot Arrow
+Cada medição roda em um processo novo (cache frio do interpretador)
+
+Uso: python benchmarks/benchmark_snapshot.py [arquivo.csv] [repeticoes]
+"""
+
+import glob
+import json
+import os
+import subprocess
+import sys
+import statistics
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import snapshot_dados
+
+# Código executado no processo filho: mede tempo e memória residente da carga
+CODIGO_FILHO = """
+import json, sys, time
+sys.path.insert(0, {raiz!r})
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for linha in f:
+            if linha.startswith('VmRSS:'):
+                return int(linha.split()[1]) / 1024
+    return 0.0
+
+import pandas as pd
+import snapshot_dados
+
+formato, caminho, colunas = {formato!r}, {caminho!r}, {colunas!r}
+rss_antes = rss_mb()
+inicio = time.perf_counter()
+if formato == 'csv':
+    df = pd.read_csv(caminho, usecols=colunas)
+else:
+    df = snapshot_dados.ler_snapshot(caminho, colunas)
+tempo_ms = (time.perf_counter() - inicio) * 1000
+print(json.dumps({{'tempo_ms': tempo_ms, 'rss_mb': rss_mb() - rss_antes, 'linhas': len(df)}}))
+"""
+
+
+def medir(formato, caminho, colunas=None, repeticoes=5):
+    """Mede tempo e memória de carga em processos independentes"""
+    resultados = []
+    for _ in range(repeticoes):
+        codigo = CODIGO_FILHO.format(raiz=RAIZ, formato=formato, caminho=caminho, colunas=colunas)
+        saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+        resultados.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+
+    return {
+        'tempo_ms': statistics.median(r['tempo_ms'] for r in resultados),
+        'rss_mb': statistics.median(r['rss_mb'] for r in resultados),
+        'linhas': resultados[0]['linhas']
+    }
+
+
+def main():
+    """Executa o comparativo e imprime a tabela de resultados"""
+    if len(sys.argv) > 1:
+        caminho_csv = sys.argv[1]
+    else:
+        caminho_csv = max(glob.glob(os.path.join(RAIZ, "analise_corrigida_faturamento_*.csv")))
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    caminho_arrow = snapshot_dados.importar_csv(caminho_csv)
+
+    # Colunas usadas pela tabela de ranking (aba Análise Completa)
+    colunas_aba = ['Ranking_Corrigido', 'Municipio', 'UF', 'Regiao', 'Populacao_2022',
+                   'Total_Franquias_Corrigida', 'Classificacao_Corrigida']
+
+    cenarios = [
+        ("CSV (todas as colunas)", "csv", caminho_csv, None),
+        ("Arrow (todas as colunas)", "arrow", caminho_arrow, None),
+        ("CSV (colunas da aba)", "csv", caminho_csv, colunas_aba),
+        ("Arrow (colunas da aba)", "arrow", caminho_arrow, colunas_aba),
+    ]
+
+    print(f"Arquivo: {os.path.basename(caminho_csv)} | repetições: {repeticoes}")
+    print(f"Tamanho em disco: CSV {os.path.getsize(caminho_csv) / 1024:.0f} KB | "
+          f"Arrow {os.path.getsize(caminho_arrow) / 1024:.0f} KB")
+    print(f"{'Cenário':<28}{'Tempo (ms)':>12}{'RSS (MB)':>12}{'Linhas':>10}")
+    for nome, formato, caminho, colunas in cenarios:
+        r = medir(formato, caminho, colunas, repeticoes)
+        print(f"{nome:<28}{r['tempo_ms']:>12.2f}{r['rss_mb']:>12.2f}{r['linhas']:>10,}")
+
+
+if __name__ == "__main__":
+    main()
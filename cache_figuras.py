@@ -0,0 +1,32 @@
+"""
+Cache de Figuras - Sofá Novo de Novo
+Especificação JSON das figuras Plotly por (snapshot/cenário, figura, filtros)
+"""
+
+import json
+
+import streamlit as st
+
+# Figuras guardadas (LRU); as especificações atuais têm de 5 a 40 KB
+MAX_FIGURAS = 64
+
+
+@st.cache_data(max_entries=MAX_FIGURAS)
+def _especificacao(_construir, chave_dados, nome, filtros):
+    """JSON da figura: agregação e construção Plotly só na primeira vez"""
+    import plotly.io as pio
+
+    fig = _construir()
+    return None if fig is None else pio.to_json(fig, validate=False)
+
+
+def figura_em_cache(construir, chave_dados, nome, filtros=()):
+    """Figura da chave (dados, nome, filtros); None se a construção falhou"""
+    import plotly.graph_objects as go
+
+    especificacao = _especificacao(construir, chave_dados, nome, filtros)
+    if especificacao is None:
+        return None
+
+    # A especificação já foi validada na construção: reidrata sem revalidar
+    return go.Figure(json.loads(especificacao), _validate=False)
@@ -0,0 +1,184 @@
+"""
+Índice Espacial - Sofá Novo de Novo
+Consultas por distância (haversine) entre pontos lat/lon em lote: raio, mais próximo e k mais próximos
+
+Os pontos viram vetores unitários 3D e são agrupados em uma grade de cubos
+(ordem por célula + faixas via searchsorted). A corda entre dois vetores é
+monótona com a distância na superfície, então cada consulta só compara com
+as células vizinhas; o resultado é convertido para km pela fórmula haversine.
+"""
+
+import numpy as np
+
+RAIO_TERRA_KM = 6371.0088
+
+# Pares (consulta, célula ou ponto) avaliados por bloco de consultas: limita a memória
+PARES_POR_BLOCO = 2_000_000
+
+# Pontos por célula visados quando o tamanho da célula não é informado
+PONTOS_POR_CELULA = 4
+
+
+def _unitarios(lat, lon):
+    """Vetores unitários (n x 3) das coordenadas em graus"""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def _corda(distancia_km):
+    """Corda no sólido unitário equivalente à distância na superfície"""
+    return 2 * np.sin(np.minimum(np.asarray(distancia_km, dtype=np.float64) / RAIO_TERRA_KM, np.pi) / 2)
+
+
+def _distancia(corda2):
+    """Distância na superfície (km) a partir da corda ao quadrado (haversine)"""
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.minimum(np.sqrt(corda2) / 2, 1.0))
+
+
+def distancia_km(lat1, lon1, lat2, lon2):
+    """Distância haversine (km) elemento a elemento"""
+    corda2 = ((_unitarios(lat1, lon1) - _unitarios(lat2, lon2)) ** 2).sum(axis=1)
+    return _distancia(corda2)
+
+
+def indexar(lat, lon, celula_km=None):
+    """Índice dos pontos; sem celula_km, a célula é estimada para ~PONTOS_POR_CELULA pontos"""
+    xyz = _unitarios(lat, lon)
+    n = len(xyz)
+
+    if celula_km is not None:
+        lado = float(_corda(celula_km))
+    elif n > 1:
+        # Espaçamento médio de n pontos espalhados na maior extensão dos dados
+        extensao = float((xyz.max(axis=0) - xyz.min(axis=0)).max())
+        lado = extensao * np.sqrt(PONTOS_POR_CELULA / n)
+    else:
+        lado = 0.0
+    lado = max(lado, float(_corda(0.01)))  # Nunca menor que 10 m
+
+    # Coordenadas inteiras da célula, deslocadas para não negativas, e chave única
+    meia_largura = int(np.ceil(1 / lado)) + 1
+    largura = 2 * meia_largura + 1
+    celula = np.floor(xyz / lado).astype(np.int64) + meia_largura
+    chave = (celula[:, 0] * largura + celula[:, 1]) * largura + celula[:, 2]
+
+    ordem = np.argsort(chave, kind='stable')
+    chaves, inicio, contagem = np.unique(chave[ordem], return_index=True, return_counts=True)
+    return {
+        'xyz': xyz, 'lado': lado, 'meia_largura': meia_largura, 'largura': largura,
+        'ordem': ordem, 'chaves': chaves, 'inicio': inicio, 'contagem': contagem
+    }
+
+
+def _pares(indice, xyz, corda):
+    """Pares (consulta, ponto, corda²) a até `corda` de distância, em ordem de consulta"""
+    lado, largura = indice['lado'], indice['largura']
+    chaves, ordem = indice['chaves'], indice['ordem']
+    n_pontos = len(ordem)
+
+    alcance = int(np.ceil(corda / lado))
+    if n_pontos == 0 or len(xyz) == 0:
+        vazio = np.empty(0, dtype=np.int64)
+        return vazio, vazio, np.empty(0)
+
+    if (2 * alcance + 1) ** 3 >= len(chaves):
+        # Vizinhança maior que o índice: compara com todos os pontos
+        consulta = np.repeat(np.arange(len(xyz)), n_pontos)
+        ponto = np.tile(np.arange(n_pontos), len(xyz))
+    else:
+        # Só as células que podem ter pontos a até `corda` (descarta os cantos do cubo)
+        passos = np.arange(-alcance, alcance + 1)
+        dx, dy, dz = (eixo.ravel() for eixo in np.meshgrid(passos, passos, passos, indexing='ij'))
+        folga = np.maximum(np.abs(np.column_stack((dx, dy, dz))) - 1, 0)
+        alcancavel = (folga ** 2).sum(axis=1) * lado * lado <= corda * corda
+        deslocamentos = ((dx * largura + dy) * largura + dz)[alcancavel]
+
+        celula = np.floor(xyz / lado).astype(np.int64) + indice['meia_largura']
+        chave = (celula[:, 0] * largura + celula[:, 1]) * largura + celula[:, 2]
+        vizinhas = chave[:, None] + deslocamentos[None, :]
+
+        posicao = np.minimum(np.searchsorted(chaves, vizinhas), len(chaves) - 1)
+        linha, coluna = np.nonzero(chaves[posicao] == vizinhas)
+        faixa = posicao[linha, coluna]
+        quantos = indice['contagem'][faixa]
+
+        # Expande cada célula encontrada nas posições dos seus pontos
+        consulta = np.repeat(linha, quantos)
+        deslocamento = np.arange(quantos.sum()) - np.repeat(np.cumsum(quantos) - quantos, quantos)
+        ponto = ordem[np.repeat(indice['inicio'][faixa], quantos) + deslocamento]
+
+    corda2 = ((xyz[consulta] - indice['xyz'][ponto]) ** 2).sum(axis=1)
+    dentro = corda2 <= corda * corda
+    return consulta[dentro], ponto[dentro], corda2[dentro]
+
+
+def _vizinhos(indice, xyz, corda, ordenar=True):
+    """Vizinhos por consulta em formato CSR (ponteiros, pontos, corda²), do mais próximo ao mais distante"""
+    vizinhanca = (2 * int(np.ceil(corda / indice['lado'])) + 1) ** 3
+    bloco = max(1, PARES_POR_BLOCO // max(1, min(vizinhanca, len(indice['ordem']))))
+
+    consultas, pontos, cordas2 = [], [], []
+    for inicio in range(0, len(xyz), bloco):
+        consulta, ponto, corda2 = _pares(indice, xyz[inicio:inicio + bloco], corda)
+        consultas.append(consulta + inicio)
+        pontos.append(ponto)
+        cordas2.append(corda2)
+
+    consulta = np.concatenate(consultas) if consultas else np.empty(0, dtype=np.int64)
+    ponto = np.concatenate(pontos) if pontos else np.empty(0, dtype=np.int64)
+    corda2 = np.concatenate(cordas2) if cordas2 else np.empty(0)
+
+    ponteiros = np.r_[0, np.cumsum(np.bincount(consulta, minlength=len(xyz)))]
+    if not ordenar:
+        return ponteiros, ponto, corda2
+
+    # Os pares já vêm agrupados por consulta: uma chave consulta + corda²/corda² máxima
+    # (sempre em [consulta, consulta + 1)) ordena por consulta e distância numa só ordenação
+    ordem = np.argsort(consulta + corda2 / (2 * max(corda * corda, np.finfo(float).tiny)))
+    return ponteiros, ponto[ordem], corda2[ordem]
+
+
+def vizinhos_no_raio(indice, lat, lon, raio_km):
+    """Pontos a até raio_km de cada consulta: (ponteiros, posições, distâncias km) em CSR"""
+    ponteiros, pontos, corda2 = _vizinhos(indice, _unitarios(lat, lon), float(_corda(raio_km)))
+    return ponteiros, pontos, _distancia(corda2)
+
+
+def contar_no_raio(indice, lat, lon, raio_km):
+    """Quantidade de pontos a até raio_km de cada consulta"""
+    ponteiros, _, _ = _vizinhos(indice, _unitarios(lat, lon), float(_corda(raio_km)), ordenar=False)
+    return np.diff(ponteiros)
+
+
+def k_mais_proximos(indice, lat, lon, k=1):
+    """Posições e distâncias (km) dos k pontos mais próximos; -1 e inf onde há menos de k pontos"""
+    xyz = _unitarios(lat, lon)
+    posicoes = np.full((len(xyz), k), -1, dtype=np.int64)
+    distancias = np.full((len(xyz), k), np.inf)
+    k_efetivo = min(k, len(indice['ordem']))
+    if k_efetivo == 0:
+        return posicoes, distancias
+
+    # Raio dobrado até cada consulta ter k vizinhos: quem tem k dentro do raio
+    # já tem os k mais próximos; corda 2 cobre a esfera inteira
+    pendentes = np.arange(len(xyz))
+    corda = indice['lado']
+    while len(pendentes):
+        ponteiros, pontos, corda2 = _vizinhos(indice, xyz[pendentes], corda)
+        resolvidas = np.flatnonzero(np.diff(ponteiros) >= k_efetivo) if corda < 2 else np.arange(len(pendentes))
+
+        colunas = ponteiros[resolvidas, None] + np.arange(k_efetivo)[None, :]
+        posicoes[pendentes[resolvidas], :k_efetivo] = pontos[colunas]
+        distancias[pendentes[resolvidas], :k_efetivo] = _distancia(corda2[colunas])
+
+        pendentes = np.delete(pendentes, resolvidas)
+        corda *= 2
+    return posicoes, distancias
+
+
+def mais_proximo(indice, lat, lon):
+    """Posição e distância (km) do ponto mais próximo de cada consulta"""
+    posicoes, distancias = k_mais_proximos(indice, lat, lon, 1)
+    return posicoes[:, 0], distancias[:, 0]
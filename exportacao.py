@@ -0,0 +1,93 @@
+"""
+Exportação de Tabelas - Sofá Novo de Novo
+CSV, Parquet e XLSX gerados só quando pedidos, em um worker de segundo plano
+
+Cada artefato fica guardado por (chave da visão, formato): downloads repetidos
+da mesma visão, em qualquer sessão, reaproveitam os bytes já gerados.
+"""
+
+import importlib.util
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Formato -> (extensão, MIME)
+FORMATOS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'XLSX': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+# Gerados em segundo plano com aviso de andamento; CSV sai direto no clique
+FORMATOS_PESADOS = ('Parquet', 'XLSX')
+
+# Motor de cada formato (XLSX precisa do openpyxl, ver requirements.txt)
+DEPENDENCIAS = {'Parquet': 'pyarrow', 'XLSX': 'openpyxl'}
+
+LINHAS_POR_BLOCO = 50_000
+MAX_ARTEFATOS = 16
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='exportacao')
+_tarefas = OrderedDict()
+_trava = threading.Lock()
+
+
+def formatos_disponiveis():
+    """Formatos cujo motor está instalado"""
+    return [
+        formato for formato in FORMATOS
+        if formato not in DEPENDENCIAS or importlib.util.find_spec(DEPENDENCIAS[formato]) is not None
+    ]
+
+
+def gerar_csv(df):
+    """CSV escrito em blocos de linhas (sem montar o texto inteiro de uma vez)"""
+    buffer = io.BytesIO()
+    buffer.write(df.iloc[:0].to_csv(index=False).encode('utf-8'))
+    for inicio in range(0, len(df), LINHAS_POR_BLOCO):
+        bloco = df.iloc[inicio:inicio + LINHAS_POR_BLOCO]
+        buffer.write(bloco.to_csv(index=False, header=False).encode('utf-8'))
+    return buffer.getvalue()
+
+
+def gerar_parquet(df):
+    """Parquet (mantém tipos numéricos e categorias)"""
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def gerar_xlsx(df):
+    """Planilha Excel com uma aba"""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as planilha:
+        df.to_excel(planilha, index=False, sheet_name='Dados')
+    return buffer.getvalue()
+
+
+GERADORES = {'CSV': gerar_csv, 'Parquet': gerar_parquet, 'XLSX': gerar_xlsx}
+
+
+def consultar(chave, formato):
+    """Tarefa (Future) já pedida para a visão e o formato, ou None"""
+    with _trava:
+        return _tarefas.get((chave, formato))
+
+
+def solicitar(chave, formato, gerar_tabela):
+    """Future com os bytes do artefato; reaproveita o existente ou agenda a geração"""
+    with _trava:
+        tarefa = _tarefas.get((chave, formato))
+
+        # Falhas não ficam em cache: um novo pedido tenta de novo
+        if tarefa is None or (tarefa.done() and tarefa.exception() is not None):
+            tarefa = _executor.submit(lambda: GERADORES[formato](gerar_tabela()))
+            _tarefas[(chave, formato)] = tarefa
+
+        _tarefas.move_to_end((chave, formato))
+        while len(_tarefas) > MAX_ARTEFATOS:
+            _tarefas.popitem(last=False)
+    return tarefa
@@ -0,0 +1,56 @@
+"""
+Formatação de Tabelas - Sofá Novo de Novo
+Formatos declarados por coluna e aplicados no navegador (valores continuam numéricos)
+"""
+
+import streamlit as st
+
+# Especificadores printf do st.column_config (sprintf-js: ',' separa milhares)
+FORMATOS = {
+    'moeda': "R$ %,.0f",
+    'milhar': "%,d",
+    'percentual': "%.1f%%",
+    'meses': "%.1f meses"
+}
+
+# Formato por nome de coluna: nomes do snapshot e rótulos já renomeados para exibição
+FORMATOS_COLUNAS = {
+    # Milhares
+    'Populacao_2022': 'milhar',
+    'População': 'milhar',
+    'População Total': 'milhar',
+    'Pop_Classe_AB': 'milhar',
+    'Pop. Classe A/B': 'milhar',
+    'Mercado_Total_Servicos': 'milhar',
+    'Serviços/Ano Total': 'milhar',
+    # Percentuais (já em pontos: 23.4 -> 23.4%)
+    'Classe_AB_PNAD': 'percentual',
+    '% Classe A/B': 'percentual',
+    # Moeda
+    'PIB per capita': 'moeda',
+    'Faturamento_Mensal_Estimado': 'moeda',
+    'Faturamento_Mensal_Franquia': 'moeda',
+    'Faturamento/Mês': 'moeda',
+    'Vendas Ano': 'moeda',
+    'Royalties/Mês': 'moeda',
+    'Royalties/Ano': 'moeda',
+    'Total Ano': 'moeda',
+    'Renda Média': 'moeda',
+    # Meses
+    'Payback_Meses': 'meses',
+    'Payback': 'meses'
+}
+
+
+def configurar_colunas(df, formatos=None):
+    """column_config com o formato declarado de cada coluna presente no DataFrame"""
+    formatos = {**FORMATOS_COLUNAS, **(formatos or {})}
+    return {
+        coluna: st.column_config.NumberColumn(format=FORMATOS[formatos[coluna]])
+        for coluna in df.columns if coluna in formatos
+    }
+
+
+def exibir_tabela(df, formatos=None, **opcoes):
+    """st.dataframe com formatação no cliente; ordenação numérica preservada"""
+    st.dataframe(df, column_config=configurar_colunas(df, formatos), **opcoes)
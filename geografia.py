@@ -0,0 +1,79 @@
+"""
+Dimensão Geográfica - Sofá Novo de Novo
+UFs indexadas pelo prefixo de 2 dígitos do código IBGE do município
+"""
+
+import numpy as np
+import pandas as pd
+
+# Código IBGE da UF: (sigla, nome, região)
+UFS = {
+    11: ('RO', 'Rondônia', 'Norte'),
+    12: ('AC', 'Acre', 'Norte'),
+    13: ('AM', 'Amazonas', 'Norte'),
+    14: ('RR', 'Roraima', 'Norte'),
+    15: ('PA', 'Pará', 'Norte'),
+    16: ('AP', 'Amapá', 'Norte'),
+    17: ('TO', 'Tocantins', 'Norte'),
+    21: ('MA', 'Maranhão', 'Nordeste'),
+    22: ('PI', 'Piauí', 'Nordeste'),
+    23: ('CE', 'Ceará', 'Nordeste'),
+    24: ('RN', 'Rio Grande do Norte', 'Nordeste'),
+    25: ('PB', 'Paraíba', 'Nordeste'),
+    26: ('PE', 'Pernambuco', 'Nordeste'),
+    27: ('AL', 'Alagoas', 'Nordeste'),
+    28: ('SE', 'Sergipe', 'Nordeste'),
+    29: ('BA', 'Bahia', 'Nordeste'),
+    31: ('MG', 'Minas Gerais', 'Sudeste'),
+    32: ('ES', 'Espírito Santo', 'Sudeste'),
+    33: ('RJ', 'Rio de Janeiro', 'Sudeste'),
+    35: ('SP', 'São Paulo', 'Sudeste'),
+    41: ('PR', 'Paraná', 'Sul'),
+    42: ('SC', 'Santa Catarina', 'Sul'),
+    43: ('RS', 'Rio Grande do Sul', 'Sul'),
+    50: ('MS', 'Mato Grosso do Sul', 'Centro-Oeste'),
+    51: ('MT', 'Mato Grosso', 'Centro-Oeste'),
+    52: ('GO', 'Goiás', 'Centro-Oeste'),
+    53: ('DF', 'Distrito Federal', 'Centro-Oeste')
+}
+
+# Categorias em ordem alfabética: groupby devolve a mesma ordem que em texto
+SIGLAS = sorted(sigla for sigla, _, _ in UFS.values())
+NOMES = sorted(nome for _, nome, _ in UFS.values())
+REGIOES = sorted({regiao for _, _, regiao in UFS.values()})
+
+DIMENSAO_UF = pd.DataFrame(
+    [(codigo, sigla, nome, regiao) for codigo, (sigla, nome, regiao) in UFS.items()],
+    columns=['Codigo_UF', 'UF_Sigla', 'UF_Nome', 'Regiao_UF']
+)
+
+
+def _tabela_codigos(valores, categorias):
+    """Vetor de consulta: código da UF -> código da categoria (-1 se desconhecido)"""
+    tabela = np.full(100, -1, dtype=np.int8)
+    posicao = {valor: i for i, valor in enumerate(categorias)}
+    for codigo, valor in zip(DIMENSAO_UF['Codigo_UF'], valores):
+        tabela[codigo] = posicao[valor]
+    return tabela
+
+
+_CODIGOS_SIGLA = _tabela_codigos(DIMENSAO_UF['UF_Sigla'], SIGLAS)
+_CODIGOS_NOME = _tabela_codigos(DIMENSAO_UF['UF_Nome'], NOMES)
+_CODIGOS_REGIAO = _tabela_codigos(DIMENSAO_UF['Regiao_UF'], REGIOES)
+
+
+def codigo_uf(codigo_ibge):
+    """Prefixo de 2 dígitos (UF) de códigos IBGE de município (6 ou 7 dígitos)"""
+    codigos = np.asarray(codigo_ibge, dtype=np.int64)
+    return np.where(codigos >= 1_000_000, codigos // 100_000, codigos // 10_000)
+
+
+def juntar_geografia(df, coluna_codigo='Codigo_IBGE'):
+    """Adiciona UF_Sigla, UF_Nome e Regiao_UF como colunas categóricas"""
+    uf = np.clip(codigo_uf(df[coluna_codigo].to_numpy()), 0, 99)
+
+    return df.assign(
+        UF_Sigla=pd.Categorical.from_codes(_CODIGOS_SIGLA[uf], categories=SIGLAS),
+        UF_Nome=pd.Categorical.from_codes(_CODIGOS_NOME[uf], categories=NOMES),
+        Regiao_UF=pd.Categorical.from_codes(_CODIGOS_REGIAO[uf], categories=REGIOES)
+    )
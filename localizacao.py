@@ -0,0 +1,94 @@
+"""
+Otimizador de Localização - Sofá Novo de Novo
+Onde abrir K novas unidades para cobrir o máximo de domicílios classe A/B
+
+Cobertura máxima (facility location): cada local candidato cobre os pontos de
+demanda a até o raio de atendimento; os domicílios já cobertos pelas unidades
+existentes não contam. Os conjuntos de cobertura são calculados uma vez pelo
+índice espacial e o guloso preguiçoso (lazy greedy) só recalcula o ganho do
+local no topo do heap: como a cobertura é submodular, o ganho de um local só
+diminui e o ganho antigo é um limite superior válido.
+"""
+
+import heapq
+
+import numpy as np
+
+import espacial
+from metricas_negocio import PESSOAS_POR_FAMILIA
+
+# Distância máxima (km) entre o cliente e a unidade que o atende
+RAIO_ATENDIMENTO_KM = 3.0
+
+
+def conjuntos_cobertura(lat_demanda, lon_demanda, lat_locais, lon_locais, raio_km=RAIO_ATENDIMENTO_KM):
+    """Pontos de demanda a até raio_km de cada local: (ponteiros, posições) em CSR"""
+    indice = espacial.indexar(lat_demanda, lon_demanda)
+    ponteiros, pontos, _ = espacial.vizinhos_no_raio(indice, lat_locais, lon_locais, raio_km)
+    return ponteiros, pontos
+
+
+def cobertos(lat_demanda, lon_demanda, lat_unidades, lon_unidades, raio_km=RAIO_ATENDIMENTO_KM):
+    """Máscara dos pontos de demanda a até raio_km de alguma unidade"""
+    if len(lat_unidades) == 0:
+        return np.zeros(len(lat_demanda), dtype=bool)
+    indice = espacial.indexar(lat_unidades, lon_unidades)
+    return espacial.contar_no_raio(indice, lat_demanda, lon_demanda, raio_km) > 0
+
+
+def guloso_preguicoso(ponteiros, pontos, peso, k, coberto=None):
+    """Até k locais em ordem de escolha e o ganho de cada um; para quando nenhum local acrescenta cobertura"""
+    coberto = np.zeros(len(peso), dtype=bool) if coberto is None else coberto.copy()
+    peso = np.asarray(peso, dtype=np.float64)
+
+    # Ganho inicial de todos os locais de uma vez: soma dos pesos descobertos de cada conjunto
+    local_do_par = np.repeat(np.arange(len(ponteiros) - 1), np.diff(ponteiros))
+    ganhos = np.bincount(local_do_par, weights=np.where(coberto, 0, peso)[pontos], minlength=len(ponteiros) - 1)
+    heap = [(-ganho, local) for local, ganho in enumerate(ganhos.tolist()) if ganho > 0]
+    heapq.heapify(heap)
+
+    escolhidos, ganhos_escolhidos = [], []
+    while heap and len(escolhidos) < k:
+        _, local = heapq.heappop(heap)
+        conjunto = pontos[ponteiros[local]:ponteiros[local + 1]]
+        novos = conjunto[~coberto[conjunto]]
+        ganho = float(peso[novos].sum())
+
+        # Ganho atualizado abaixo do limite do próximo: volta ao heap com o valor novo
+        if heap and ganho < -heap[0][0]:
+            if ganho > 0:
+                heapq.heappush(heap, (-ganho, local))
+            continue
+        if ganho <= 0:
+            break
+        escolhidos.append(local)
+        ganhos_escolhidos.append(ganho)
+        coberto[novos] = True
+    return escolhidos, ganhos_escolhidos
+
+
+def planejar(lat_demanda, lon_demanda, peso, lat_locais, lon_locais, k,
+             lat_existentes=(), lon_existentes=(), raio_km=RAIO_ATENDIMENTO_KM):
+    """Plano de k unidades: locais escolhidos, ganho de cada um e demanda coberta antes e depois"""
+    peso = np.asarray(peso, dtype=np.float64)
+    coberto = cobertos(lat_demanda, lon_demanda, lat_existentes, lon_existentes, raio_km)
+    ponteiros, pontos = conjuntos_cobertura(lat_demanda, lon_demanda, lat_locais, lon_locais, raio_km)
+    escolhidos, ganhos = guloso_preguicoso(ponteiros, pontos, peso, k, coberto)
+
+    coberto_existentes = float(peso[coberto].sum())
+    return {
+        'escolhidos': escolhidos,
+        'ganhos': ganhos,
+        'total': float(peso.sum()),
+        'coberto_existentes': coberto_existentes,
+        'coberto_plano': coberto_existentes + sum(ganhos)
+    }
+
+
+def domicilios_ab_estimados(candidatos, classe_ab_pct):
+    """Domicílios classe A/B por candidato sem setores: % A/B do município ajustado pela renda relativa"""
+    populacao = np.array([c['populacao'] for c in candidatos], dtype=np.float64)
+    renda = np.array([c['renda_media'] for c in candidatos], dtype=np.float64)
+    renda_relativa = renda / renda.mean() if len(renda) and renda.mean() > 0 else np.ones(len(renda))
+    participacao = np.minimum(classe_ab_pct / 100 * renda_relativa, 1.0)
+    return populacao / PESSOAS_POR_FAMILIA * participacao
@@ -0,0 +1,106 @@
+"""
+Malhas Geográficas - Sofá Novo de Novo
+GeoJSON simplificado de UFs e municípios servido como arquivo estático
+
+O navegador baixa cada malha uma vez pela URL e a reaproveita entre reruns
+e sessões; as figuras levam só a URL, não a geometria.
+
+Uso (gera os arquivos locais a partir da API de malhas do IBGE):
+    python malhas.py              só as malhas usadas pelo app (QUALIDADE_PADRAO)
+    python malhas.py qualidade... todas as divisões nas qualidades pedidas
+"""
+
+import json
+import os
+import sys
+import urllib.request
+
+# Pasta static/ do app (server.enableStaticServing em .streamlit/config.toml)
+DIRETORIO_MALHAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'malhas')
+URL_ESTATICA = "app/static/malhas/{arquivo}"
+
+# Níveis de simplificação publicados pelo IBGE, do mais leve ao mais detalhado
+QUALIDADES = ('minima', 'intermediaria', 'maxima')
+
+# Casas decimais mantidas nas coordenadas (3 casas ~ 110 m)
+CASAS_DECIMAIS = {'minima': 3, 'intermediaria': 4, 'maxima': 5}
+
+# Nível da malha -> parâmetro intrarregiao da API
+DIVISOES = {'uf': 'UF', 'municipio': 'municipio'}
+
+# Malha usada por padrão: municípios na mais leve para manter o payload pequeno
+QUALIDADE_PADRAO = {'uf': 'intermediaria', 'municipio': 'minima'}
+
+URL_MALHA = ("https://servicodados.ibge.gov.br/api/v3/malhas/paises/BR"
+             "?formato=application/vnd.geo%2Bjson&qualidade={qualidade}&intrarregiao={divisao}")
+
+
+def arquivo_malha(nivel, qualidade=None):
+    """Nome do arquivo da malha (ex.: municipio_minima.geojson)"""
+    return f"{nivel}_{qualidade or QUALIDADE_PADRAO[nivel]}.geojson"
+
+
+def caminho_malha(nivel, qualidade=None):
+    """Caminho local do arquivo da malha"""
+    return os.path.join(DIRETORIO_MALHAS, arquivo_malha(nivel, qualidade))
+
+
+def url_malha(nivel, qualidade=None):
+    """URL relativa da malha no servidor estático do Streamlit"""
+    return URL_ESTATICA.format(arquivo=arquivo_malha(nivel, qualidade))
+
+
+def malha_disponivel(nivel, qualidade=None):
+    """Indica se o arquivo da malha já foi gerado"""
+    return os.path.exists(caminho_malha(nivel, qualidade))
+
+
+def _arredondar(coordenadas, casas):
+    """Arredonda coordenadas aninhadas de qualquer tipo de geometria"""
+    if isinstance(coordenadas[0], (int, float)):
+        return [round(valor, casas) for valor in coordenadas]
+    return [_arredondar(parte, casas) for parte in coordenadas]
+
+
+def preparar_malha(nivel, qualidade):
+    """Baixa a malha do IBGE, mantém só código (id) e geometria e grava em disco"""
+    url = URL_MALHA.format(qualidade=qualidade, divisao=DIVISOES[nivel])
+    with urllib.request.urlopen(url, timeout=120) as resposta:
+        malha = json.load(resposta)
+
+    casas = CASAS_DECIMAIS[qualidade]
+    feicoes = [
+        {
+            'type': 'Feature',
+            'id': int(feicao['properties']['codarea']),
+            'properties': {},
+            'geometry': {
+                'type': feicao['geometry']['type'],
+                'coordinates': _arredondar(feicao['geometry']['coordinates'], casas)
+            }
+        }
+        for feicao in malha['features']
+    ]
+
+    os.makedirs(DIRETORIO_MALHAS, exist_ok=True)
+    caminho = caminho_malha(nivel, qualidade)
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump({'type': 'FeatureCollection', 'features': feicoes}, arquivo, separators=(',', ':'))
+    return caminho, len(feicoes)
+
+
+def main():
+    """Gera as malhas de UF e município nas qualidades pedidas (padrão: a qualidade usada de cada nível)"""
+    invalidas = [qualidade for qualidade in sys.argv[1:] if qualidade not in QUALIDADES]
+    if invalidas:
+        sys.exit(f"Qualidade desconhecida: {', '.join(invalidas)} (use {', '.join(QUALIDADES)})")
+
+    pedidos = [(nivel, qualidade) for nivel in DIVISOES for qualidade in sys.argv[1:]] or \
+        list(QUALIDADE_PADRAO.items())
+    for nivel, qualidade in pedidos:
+        caminho, n_feicoes = preparar_malha(nivel, qualidade)
+        print(f"{caminho}: {n_feicoes:,} feições, {os.path.getsize(caminho) / 1024:,.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Métricas de Negócio - Sofá Novo de Novo
+Cálculos vetorizados sobre o DataFrame de municípios
+"""
+
+import numpy as np
+import pandas as pd
+
+# Parâmetros do negócio
+TICKET_MEDIO = 250  # R$ por serviço (atualizado)
+PENETRACAO_MERCADO_BASE = 0.02  # 2% das famílias classe A/B usam o serviço por ano
+SERVICOS_POR_FAMILIA_ANO = 2.5  # Frequência média anual
+PESSOAS_POR_FAMILIA = 3.2  # Média brasileira
+INTERNET_BASE = 70  # % de penetração de internet de referência
+
+
+def calcular_mercado(pop, classe_ab_pct, internet_pct, penetracao_mercado=PENETRACAO_MERCADO_BASE,
+                     servicos_por_familia=SERVICOS_POR_FAMILIA_ANO, pessoas_por_familia=PESSOAS_POR_FAMILIA):
+    """Classe A/B (habitantes) e mercado anual de serviços por município"""
+
+    # 1. Tamanho estimado da classe A/B (população), truncado como int()
+    pop_classe_ab = np.trunc(pop * (classe_ab_pct / 100)).astype(np.int64)
+
+    # 2. Número de famílias classe A/B
+    familias_classe_ab = np.trunc(pop_classe_ab / pessoas_por_familia).astype(np.int64)
+
+    # 3. Ajuste por penetração de internet (afeta marketing digital), teto 1.0
+    fator_internet = internet_pct / INTERNET_BASE
+    fator_internet = np.where(fator_internet < 1.0, fator_internet, 1.0)
+
+    # 4. Mercado total de serviços por ano
+    mercado_total_servicos = np.trunc(
+        familias_classe_ab * penetracao_mercado * servicos_por_familia * fator_internet
+    ).astype(np.int64)
+
+    return pop_classe_ab, mercado_total_servicos
+
+
+def calcular_metricas_negocio(df, ticket_medio=TICKET_MEDIO, **parametros_mercado):
+    """Calcula métricas de negócio para todas as cidades de uma vez"""
+
+    pop = df['Populacao_2022'].to_numpy(dtype=np.int64)
+    classe_ab_pct = df['Classe_AB_PNAD'].to_numpy(dtype=np.float64)
+    total_franquias = df['Total_Franquias_Realista'].to_numpy(dtype=np.float64)
+    internet_pct = df['Penetracao_Internet_PNAD'].to_numpy(dtype=np.float64)
+
+    pop_classe_ab, mercado_total_servicos = calcular_mercado(pop, classe_ab_pct, internet_pct, **parametros_mercado)
+
+    # 5. Serviços por franquia (zero onde não há franquias)
+    com_franquias = total_franquias > 0
+    servicos_por_franquia = np.zeros(len(df))
+    np.divide(mercado_total_servicos, total_franquias, out=servicos_por_franquia, where=com_franquias)
+
+    # 6. Faturamento estimado por franquia por mês
+    faturamento_mensal = np.where(servicos_por_franquia > 0, (servicos_por_franquia * ticket_medio) / 12, 0.0)
+
+    return pd.DataFrame({
+        'Pop_Classe_AB': pop_classe_ab.astype(np.int32),
+        'Mercado_Total_Servicos': mercado_total_servicos.astype(np.int32),
+        'Servicos_Por_Franquia': np.round(servicos_por_franquia, 1),
+        'Faturamento_Mensal_Franquia': np.round(faturamento_mensal, 0)
+    }, index=df.index)
+
+# Parâmetros de referência das justificativas
+PIB_MEDIO = 35000
+IDH_MEDIO = 0.7
+CLASSE_MEDIA = 18
+INTERNET_MEDIA = 70
+TRENDS_MEDIO = 50
+
+
+def _formatar(modelo, valores, mascara):
+    """Formata o texto só nas linhas da máscara ('' nas demais)"""
+    saida = np.full(len(mascara), '', dtype=object)
+    indices = np.flatnonzero(mascara)
+    if len(indices):
+        # tolist() devolve escalares Python: mesma formatação do código por linha
+        saida[indices] = [modelo.format(v) for v in valores[indices].tolist()]
+    return saida
+
+
+def _fixo(texto, mascara):
+    """Texto constante nas linhas da máscara ('' nas demais)"""
+    return np.where(mascara, texto, '').astype(object)
+
+
+def _juntar(partes, separador):
+    """Junta fragmentos linha a linha ignorando os vazios"""
+    resultado = partes[0]
+    for parte in partes[1:]:
+        resultado = np.where(
+            resultado == '', parte,
+            np.where(parte == '', resultado, resultado + separador + parte)
+        )
+    return resultado
+
+
+def criar_justificativas(df, k_padrao=45000, score_sofazinho=12000):
+    """Cria justificativas detalhadas para todas as cidades a partir de máscaras"""
+
+    pop = df['Populacao_2022'].to_numpy()
+    score = df['Score_Realista'].to_numpy(dtype=np.float64)
+    pib = df['PIB_per_capita_Calibrado'].to_numpy(dtype=np.float64)
+    idh = df['IDH_Calibrado'].to_numpy(dtype=np.float64)
+    classe_ab = df['Classe_AB_PNAD'].to_numpy(dtype=np.float64)
+    internet = df['Penetracao_Internet_PNAD'].to_numpy(dtype=np.float64)
+    trends = df['Interesse_Google_Trends'].to_numpy()
+    franquias_atuais = df['Franquias_Atuais'].to_numpy()
+    total_adicional = df['Total_Franquias_Adicional'].to_numpy()
+    classificacao = df['Classificacao_Realista'].astype(object).to_numpy()
+
+    saturado = classificacao == "Saturado"
+    maxima = classificacao == "Prioridade Máxima"
+    alta_media = (classificacao == "Prioridade Alta") | (classificacao == "Prioridade Média")
+    baixa = classificacao == "Prioridade Baixa"
+    futura = ~(saturado | maxima | alta_media | baixa)  # Oportunidade Futura
+
+    # Saturado: fatores abaixo da média quando o score não alcança a franquia padrão
+    score_baixo = saturado & (score < k_padrao)
+    fatores_baixos = _juntar([
+        _formatar("PIB baixo (R$ {:,.0f})", pib, score_baixo & (pib < PIB_MEDIO * 0.8)),
+        _formatar("IDH baixo ({:.3f})", idh, score_baixo & (idh < IDH_MEDIO * 0.9)),
+        _formatar("Baixa classe A/B ({:.1f}%)", classe_ab, score_baixo & (classe_ab < CLASSE_MEDIA * 0.7)),
+        _formatar("Baixa penetração internet ({:.1f}%)", internet, score_baixo & (internet < INTERNET_MEDIA * 0.8)),
+        _formatar("Baixo interesse Google ({:.0f})", trends, score_baixo & (trends < TRENDS_MEDIO * 0.6)),
+    ], ", ")
+    score_insuficiente = np.where(fatores_baixos != '', "Score insuficiente: " + fatores_baixos, '')
+
+    # Prioridade Máxima: no máximo os 2 primeiros fatores positivos
+    condicoes_positivas = np.vstack([
+        pop >= 500000,
+        pib > PIB_MEDIO * 1.2,
+        idh > IDH_MEDIO * 1.1,
+        classe_ab > CLASSE_MEDIA * 1.3
+    ]) & maxima
+    primeiros_dois = condicoes_positivas & (np.cumsum(condicoes_positivas, axis=0) <= 2)
+    fatores_positivos = _juntar([
+        _formatar("Grande população ({:,} hab)", pop, primeiros_dois[0]),
+        _formatar("Alto PIB (R$ {:,.0f})", pib, primeiros_dois[1]),
+        _formatar("Alto IDH ({:.3f})", idh, primeiros_dois[2]),
+        _formatar("Alta classe A/B ({:.1f}%)", classe_ab, primeiros_dois[3]),
+    ], ", ")
+    excelente = np.where(maxima, "Excelente potencial: " + fatores_positivos, '')
+
+    justificativas = _juntar([
+        # Saturado
+        _formatar("Já possui {:.0f} franquia(s)", franquias_atuais, saturado & (franquias_atuais > 0)),
+        score_insuficiente,
+        _formatar("População pequena ({:,} hab) e score muito baixo", pop,
+                  saturado & (pop < 100000) & (score < score_sofazinho)),
+        # Prioridade Máxima
+        excelente,
+        _formatar("Pode receber +{:.0f} franquia(s)", total_adicional, maxima & (total_adicional > 0)),
+        # Prioridade Alta / Média
+        _formatar("Boa população ({:,} hab)", pop, alta_media & (pop >= 200000)),
+        _fixo("Score adequado", alta_media & (score >= 60000)),
+        _formatar("Potencial para +{:.0f} franquia(s)", total_adicional, alta_media & (total_adicional > 0)),
+        # Prioridade Baixa
+        _fixo("Potencial limitado", baixa),
+        _formatar("População pequena ({:,} hab)", pop, baixa & (pop < 100000)),
+        _fixo("Score baixo", baixa & (score < 30000)),
+        # Oportunidade Futura
+        _fixo("Mercado em desenvolvimento", futura),
+        _fixo("Aguardar crescimento populacional", futura & (pop < 50000)),
+    ], " | ")
+    justificativas = np.where(justificativas == '', "Análise em andamento", justificativas)
+
+    # Codificado como dicionário: textos repetidos ocupam uma única cópia
+    return pd.Series(pd.Categorical(justificativas), index=df.index, name='Justificativa')
@@ -0,0 +1,294 @@
+"""
+Modelo de Score - Sofá Novo de Novo
+Score, alocação de franquias, classificação e ranking vetorizados
+"""
+
+import numpy as np
+import pandas as pd
+
+from metricas_negocio import (
+    PENETRACAO_MERCADO_BASE, PESSOAS_POR_FAMILIA, SERVICOS_POR_FAMILIA_ANO, TICKET_MEDIO, calcular_mercado
+)
+
+# Bases de calibração dos fatores do score
+PIB_BASE = 32000
+IDH_BASE = 0.69
+CLASSE_AB_BASE = 16
+FATORES_REGIONAIS = {
+    'Sudeste': 1.2,
+    'Sul': 1.1,
+    'Centro-Oeste': 1.05,
+    'Nordeste': 0.9,
+    'Norte': 0.85
+}
+
+# Alocação realista
+K_PADRAO = 45000  # Score por franquia padrão
+SCORE_SOFAZINHO = 12000  # Score mínimo para sofázinho
+POPULACAO_POR_FRANQUIA = 250000  # Teto: 1 franquia padrão a cada 250k hab
+POPULACAO_SOFAZINHO = (20000, 99999)  # Faixa de população do sofázinho
+
+# Correção por faturamento
+POPULACAO_CIDADE_GRANDE = 100000
+FATURAMENTO_MINIMO_PADRAO = 7000  # R$/mês abaixo disso a cidade pequena vira sofázinho
+INVESTIMENTO_PADRAO = 70000
+INVESTIMENTO_SOFAZINHO = 24000
+
+# Categorias em ordem de prioridade; o modelo trabalha com os códigos
+CLASSIFICACOES = pd.CategoricalDtype(['Prioridade Máxima', 'Prioridade Alta', 'Prioridade Média',
+                                      'Prioridade Baixa', 'Oportunidade Futura', 'Saturado'])
+MAXIMA, ALTA, MEDIA, BAIXA, FUTURA, SATURADO = range(6)
+PADRAO, PADRAO_EXCECAO, SOFAZINHO, SOFAZINHO_FATURAMENTO, SEM_FRANQUIA = range(5)
+
+# Parâmetros ajustáveis do cenário e etapas que dependem de cada um
+PARAMETROS_PADRAO = {
+    'ticket_medio': TICKET_MEDIO,
+    'penetracao_mercado': PENETRACAO_MERCADO_BASE,
+    'servicos_por_familia': SERVICOS_POR_FAMILIA_ANO,
+    'pessoas_por_familia': PESSOAS_POR_FAMILIA,
+    'k_padrao': K_PADRAO,
+    'score_sofazinho': SCORE_SOFAZINHO,
+    'populacao_por_franquia': POPULACAO_POR_FRANQUIA,
+    'faturamento_minimo_padrao': FATURAMENTO_MINIMO_PADRAO
+}
+DEPENDENCIAS = {
+    'alocacao': ('k_padrao', 'score_sofazinho', 'populacao_por_franquia'),
+    'mercado': ('penetracao_mercado', 'servicos_por_familia', 'pessoas_por_familia'),
+}
+# Correção usa alocação e mercado: depende dos parâmetros de ambos
+DEPENDENCIAS['correcao'] = (DEPENDENCIAS['alocacao'] + DEPENDENCIAS['mercado'] +
+                            ('ticket_medio', 'faturamento_minimo_padrao'))
+
+# Colunas de entrada do modelo (as demais são derivadas)
+COLUNAS_ENTRADA = ['Codigo_IBGE', 'Municipio', 'UF', 'Regiao', 'Populacao_2022',
+                   'PIB_per_capita_Calibrado', 'IDH_Calibrado', 'Classe_AB_PNAD',
+                   'Penetracao_Internet_PNAD', 'Interesse_Google_Trends', 'Franquias_Atuais']
+
+# Colunas derivadas na ordem do arquivo de análise
+COLUNAS_MODELO = ['Score_Realista', 'Franquias_Padrao_Realista', 'Franquias_Sofazinho_Realista',
+                  'Total_Franquias_Realista', 'Tem_Franquia', 'Franquias_Padrao_Adicional',
+                  'Franquias_Sofazinho_Adicional', 'Total_Franquias_Adicional', 'Classificacao_Realista',
+                  'Ranking_Realista', 'Pop_Classe_AB', 'Mercado_Total_Servicos',
+                  'Franquias_Padrao_Corrigida', 'Franquias_Sofazinho_Corrigida', 'Total_Franquias_Corrigida',
+                  'Faturamento_Mensal_Estimado', 'Tipo_Recomendado', 'Franquias_Padrao_Adicional_Corrigida',
+                  'Franquias_Sofazinho_Adicional_Corrigida', 'Total_Franquias_Adicional_Corrigida',
+                  'Classificacao_Corrigida', 'Ranking_Corrigido', 'Payback_Meses']
+
+
+def fator_regional(regiao):
+    """F_Região por município (1.0 para região desconhecida)"""
+    regiao = pd.Categorical(regiao)
+    fatores = [FATORES_REGIONAIS.get(nome, 1.0) for nome in regiao.categories]
+    # Código -1 (ausente) cai no último elemento: fator neutro
+    return np.array(fatores + [1.0])[regiao.codes]
+
+
+def calcular_score(pop, pib, idh, classe_ab, trends, internet, f_regiao):
+    """Score = População × F_PIB × F_IDH × F_Classe × F_Trends × F_Internet × F_Região"""
+    return (pop * (pib / PIB_BASE) * (idh / IDH_BASE) * (classe_ab / CLASSE_AB_BASE) *
+            (trends / 100) * (internet / 100) * f_regiao)
+
+
+def alocar_realista(pop, score, k_padrao=K_PADRAO, score_sofazinho=SCORE_SOFAZINHO,
+                    populacao_por_franquia=POPULACAO_POR_FRANQUIA):
+    """Franquias padrão e sofázinho pelo score"""
+    padrao = np.where(
+        score >= k_padrao,
+        np.minimum(np.floor(score / k_padrao), np.ceil(pop / populacao_por_franquia)),
+        0
+    ).astype(np.int64)
+
+    minimo, maximo = POPULACAO_SOFAZINHO
+    sofazinho = ((pop >= minimo) & (pop <= maximo) & (padrao == 0) &
+                 (score >= score_sofazinho)).astype(np.int64)
+    return padrao, sofazinho
+
+
+def classificar_realista(pop, score, total):
+    """Classificação da alocação realista (porte e score)"""
+    return np.select(
+        [total == 0,
+         pop >= 500000,
+         (pop >= 200000) & (score >= 60000),
+         pop >= 100000,
+         (pop >= 50000) & (score >= 15000)],
+        [SATURADO, MAXIMA, ALTA, MEDIA, BAIXA],
+        default=FUTURA
+    )
+
+
+def classificar_corrigida(score, total):
+    """Classificação da alocação corrigida (faixas de score)"""
+    return np.select(
+        [total == 0, score >= 100000, score >= 60000, score >= 30000, score >= 15000],
+        [SATURADO, MAXIMA, ALTA, MEDIA, BAIXA],
+        default=FUTURA
+    )
+
+
+def _dividir(numerador, denominador):
+    """Divisão elemento a elemento com zero onde o denominador não é positivo"""
+    saida = np.zeros(np.broadcast(numerador, denominador).shape)
+    np.divide(numerador, denominador, out=saida, where=denominador > 0)
+    return saida
+
+
+def corrigir_por_faturamento(pop, padrao, sofazinho, receita_mensal,
+                             faturamento_minimo=FATURAMENTO_MINIMO_PADRAO):
+    """Cidade pequena com padrão abaixo do faturamento mínimo vira sofázinho"""
+    cidade_pequena = (padrao > 0) & (pop < POPULACAO_CIDADE_GRANDE)
+    rebaixada = cidade_pequena & (_dividir(receita_mensal, padrao) < faturamento_minimo)
+    padrao_corrigida = np.where(rebaixada, 0, padrao)
+    sofazinho_corrigida = np.where(rebaixada, 1, sofazinho)
+    return padrao_corrigida, sofazinho_corrigida, rebaixada, cidade_pequena
+
+
+def calcular_payback(receita_mensal, padrao_corrigida, total_corrigida):
+    """Faturamento mensal por franquia e payback do investimento (meses)"""
+    faturamento = _dividir(receita_mensal, total_corrigida)
+    investimento = np.where(padrao_corrigida > 0, INVESTIMENTO_PADRAO, INVESTIMENTO_SOFAZINHO)
+    return faturamento, _dividir(investimento, faturamento)
+
+
+def _adicionais(padrao, sofazinho, franquias_atuais):
+    """Franquias além das atuais: padrão descontado, sofázinho só onde não há loja"""
+    padrao_adicional = np.maximum(0, padrao - franquias_atuais)
+    sofazinho_adicional = np.where(franquias_atuais > 0, 0, sofazinho)
+    return padrao_adicional, sofazinho_adicional, padrao_adicional + sofazinho_adicional
+
+
+def tipos_recomendados(faturamento_minimo=FATURAMENTO_MINIMO_PADRAO):
+    """Categorias de Tipo_Recomendado (o rótulo do sofázinho cita o faturamento mínimo)"""
+    return pd.CategoricalDtype(['Padrão', 'Padrão (cidade pequena (exceção))', 'Sofázinho',
+                                f'Sofázinho (faturamento < R$ {faturamento_minimo / 1000:g}k)',
+                                'Saturado (score insuficiente)'])
+
+
+def _categorias(codigos, categorias):
+    """Códigos do modelo como categórico com ordem fixa"""
+    return pd.Categorical.from_codes(codigos.astype(np.int8), dtype=categorias)
+
+
+def ranking(score, metodo='first'):
+    """Posição pelo score decrescente: 'first' (empate pela ordem) ou 'dense'"""
+    if metodo == 'dense':
+        _, posicao = np.unique(-score, return_inverse=True)
+        return posicao + 1
+    posicao = np.empty(len(score), dtype=np.int64)
+    posicao[np.argsort(-score, kind='stable')] = np.arange(1, len(score) + 1)
+    return posicao
+
+
+def etapa_score(df):
+    """Score e rankings (independem dos parâmetros do cenário)"""
+    score = calcular_score(
+        df['Populacao_2022'].to_numpy(dtype=np.int64),
+        df['PIB_per_capita_Calibrado'].to_numpy(dtype=np.float64),
+        df['IDH_Calibrado'].to_numpy(dtype=np.float64),
+        df['Classe_AB_PNAD'].to_numpy(dtype=np.float64),
+        df['Interesse_Google_Trends'].to_numpy(dtype=np.float64),
+        df['Penetracao_Internet_PNAD'].to_numpy(dtype=np.float64),
+        fator_regional(df['Regiao'])
+    )
+    return pd.DataFrame({
+        'Score_Realista': score,
+        'Ranking_Realista': ranking(score).astype(np.int32),
+        'Ranking_Corrigido': ranking(score, 'dense').astype(np.int32)
+    }, index=df.index)
+
+
+def etapa_alocacao(df, parametros=None):
+    """Franquias realistas, adicionais e classificação a partir do score"""
+    parametros = {**PARAMETROS_PADRAO, **(parametros or {})}
+    pop = df['Populacao_2022'].to_numpy(dtype=np.int64)
+    score = df['Score_Realista'].to_numpy(dtype=np.float64)
+    franquias_atuais = df['Franquias_Atuais'].to_numpy(dtype=np.int64)
+
+    padrao, sofazinho = alocar_realista(pop, score, parametros['k_padrao'], parametros['score_sofazinho'],
+                                        parametros['populacao_por_franquia'])
+    total = padrao + sofazinho
+    padrao_adicional, sofazinho_adicional, total_adicional = _adicionais(padrao, sofazinho, franquias_atuais)
+
+    return pd.DataFrame({
+        'Franquias_Padrao_Realista': padrao.astype(np.int32),
+        'Franquias_Sofazinho_Realista': sofazinho.astype(np.int32),
+        'Total_Franquias_Realista': total.astype(np.int32),
+        'Tem_Franquia': franquias_atuais > 0,
+        'Franquias_Padrao_Adicional': padrao_adicional.astype(np.int32),
+        'Franquias_Sofazinho_Adicional': sofazinho_adicional.astype(np.int32),
+        'Total_Franquias_Adicional': total_adicional.astype(np.int32),
+        'Classificacao_Realista': _categorias(classificar_realista(pop, score, total), CLASSIFICACOES)
+    }, index=df.index)
+
+
+def etapa_mercado(df, parametros=None):
+    """Classe A/B e mercado anual de serviços"""
+    parametros = {**PARAMETROS_PADRAO, **(parametros or {})}
+    pop_classe_ab, mercado = calcular_mercado(
+        df['Populacao_2022'].to_numpy(dtype=np.int64),
+        df['Classe_AB_PNAD'].to_numpy(dtype=np.float64),
+        df['Penetracao_Internet_PNAD'].to_numpy(dtype=np.float64),
+        **{nome: parametros[nome] for nome in DEPENDENCIAS['mercado']}
+    )
+    return pd.DataFrame({
+        'Pop_Classe_AB': pop_classe_ab.astype(np.int32),
+        'Mercado_Total_Servicos': mercado.astype(np.int32)
+    }, index=df.index)
+
+
+def etapa_correcao(df, alocacao, mercado, parametros=None):
+    """Correção por faturamento mínimo, faturamento por franquia e payback"""
+    parametros = {**PARAMETROS_PADRAO, **(parametros or {})}
+    pop = df['Populacao_2022'].to_numpy(dtype=np.int64)
+    score = df['Score_Realista'].to_numpy(dtype=np.float64)
+    franquias_atuais = df['Franquias_Atuais'].to_numpy(dtype=np.int64)
+    padrao = alocacao['Franquias_Padrao_Realista'].to_numpy(dtype=np.int64)
+    sofazinho = alocacao['Franquias_Sofazinho_Realista'].to_numpy(dtype=np.int64)
+    receita_mensal = mercado['Mercado_Total_Servicos'].to_numpy(dtype=np.int64) * parametros['ticket_medio'] / 12
+
+    padrao_corrigida, sofazinho_corrigida, rebaixada, cidade_pequena = corrigir_por_faturamento(
+        pop, padrao, sofazinho, receita_mensal, parametros['faturamento_minimo_padrao'])
+    total_corrigida = padrao_corrigida + sofazinho_corrigida
+    tipo = np.select(
+        [rebaixada, cidade_pequena, padrao > 0, sofazinho > 0],
+        [SOFAZINHO_FATURAMENTO, PADRAO_EXCECAO, PADRAO, SOFAZINHO],
+        default=SEM_FRANQUIA
+    )
+    padrao_adicional, sofazinho_adicional, total_adicional = _adicionais(
+        padrao_corrigida, sofazinho_corrigida, franquias_atuais)
+
+    faturamento, payback = calcular_payback(receita_mensal, padrao_corrigida, total_corrigida)
+
+    return pd.DataFrame({
+        'Franquias_Padrao_Corrigida': padrao_corrigida.astype(np.int32),
+        'Franquias_Sofazinho_Corrigida': sofazinho_corrigida.astype(np.int32),
+        'Total_Franquias_Corrigida': total_corrigida.astype(np.int32),
+        'Faturamento_Mensal_Estimado': faturamento.astype(np.float32),
+        'Tipo_Recomendado': _categorias(tipo, tipos_recomendados(parametros['faturamento_minimo_padrao'])),
+        'Franquias_Padrao_Adicional_Corrigida': padrao_adicional.astype(np.int32),
+        'Franquias_Sofazinho_Adicional_Corrigida': sofazinho_adicional.astype(np.int32),
+        'Total_Franquias_Adicional_Corrigida': total_adicional.astype(np.int32),
+        'Classificacao_Corrigida': _categorias(classificar_corrigida(score, total_corrigida), CLASSIFICACOES),
+        'Payback_Meses': payback.astype(np.float32)
+    }, index=df.index)
+
+
+def calcular_modelo(df, parametros=None):
+    """Recalcula todas as colunas do modelo a partir das colunas de entrada"""
+    score = etapa_score(df)
+    df = df.assign(**score)
+    alocacao = etapa_alocacao(df, parametros)
+    mercado = etapa_mercado(df, parametros)
+    correcao = etapa_correcao(df, alocacao, mercado, parametros)
+    return pd.concat([score, alocacao, mercado, correcao], axis=1)[COLUNAS_MODELO]
+
+
+def parametros_etapa(etapa, parametros):
+    """Parâmetros (ordenados) de que a etapa depende: chave do cache da etapa"""
+    return tuple((nome, parametros[nome]) for nome in sorted(DEPENDENCIAS[etapa]))
+
+
+def recalcular_colunas(df):
+    """Substitui as colunas do modelo presentes no snapshot pelas recalculadas"""
+    modelo = calcular_modelo(df)
+    return df.assign(**{coluna: modelo[coluna] for coluna in modelo.columns if coluna in df.columns})
@@ -0,0 +1,157 @@
+"""
+Simulação Monte Carlo - Sofá Novo de Novo
+Incerteza do potencial de franquias por perturbação das entradas e parâmetros
+"""
+
+import numpy as np
+import pandas as pd
+
+from metricas_negocio import calcular_mercado
+from modelo_score import (
+    DEPENDENCIAS, PARAMETROS_PADRAO, alocar_realista, calcular_payback, calcular_score,
+    corrigir_por_faturamento, fator_regional
+)
+
+# Desvio-padrão (escala log) das perturbações multiplicativas: mediana preservada
+INCERTEZAS_ENTRADAS = {
+    'PIB_per_capita_Calibrado': 0.10,
+    'IDH_Calibrado': 0.03,
+    'Classe_AB_PNAD': 0.10,
+    'Penetracao_Internet_PNAD': 0.05,
+    'Interesse_Google_Trends': 0.15
+}
+INCERTEZAS_PARAMETROS = {
+    'ticket_medio': 0.10,
+    'penetracao_mercado': 0.20,
+    'servicos_por_familia': 0.10,
+    'k_padrao': 0.10,
+    'score_sofazinho': 0.10
+}
+
+# Percentuais em pontos (Classe A/B, internet, trends) não passam de 100
+LIMITES_ENTRADAS = {
+    'IDH_Calibrado': 1.0,
+    'Classe_AB_PNAD': 100.0,
+    'Penetracao_Internet_PNAD': 100.0,
+    'Interesse_Google_Trends': 100.0
+}
+
+PERCENTIS = (10, 50, 90)
+SIMULACOES_PADRAO = 10000
+SEMENTE_PADRAO = 42
+LOTE_PADRAO = 500  # Sorteios por lote: pico de ~130 MB com 1.800 municípios
+
+
+def _perturbar(rng, valores, sigma, forma):
+    """Multiplica por ruído log-normal de mediana 1"""
+    # Ruído em float32 (metade do custo de sorteio); o produto volta a float64
+    ruido = rng.standard_normal(forma, dtype=np.float32)
+    ruido *= sigma
+    np.exp(ruido, out=ruido)
+    return valores * ruido
+
+
+def simular_lote(entradas, parametros, rng, n_sorteios):
+    """Total corrigido (sorteios × municípios) e payback médio por sorteio"""
+    n_cidades = len(entradas['Populacao_2022'])
+    forma = (n_sorteios, n_cidades)
+
+    # Entradas sorteadas por município, parâmetros sorteados por simulação (coluna)
+    sorteio = {}
+    for coluna, valores in entradas.items():
+        if coluna in INCERTEZAS_ENTRADAS:
+            valores = _perturbar(rng, valores, INCERTEZAS_ENTRADAS[coluna], forma)
+            if coluna in LIMITES_ENTRADAS:
+                valores = np.minimum(valores, LIMITES_ENTRADAS[coluna])
+        sorteio[coluna] = valores
+    p = {nome: (_perturbar(rng, valor, INCERTEZAS_PARAMETROS[nome], (n_sorteios, 1))
+                if nome in INCERTEZAS_PARAMETROS else valor)
+         for nome, valor in parametros.items()}
+
+    pop = sorteio['Populacao_2022']
+    score = calcular_score(pop, sorteio['PIB_per_capita_Calibrado'], sorteio['IDH_Calibrado'],
+                           sorteio['Classe_AB_PNAD'], sorteio['Interesse_Google_Trends'],
+                           sorteio['Penetracao_Internet_PNAD'], entradas['fator_regional'])
+    padrao, sofazinho = alocar_realista(pop, score, p['k_padrao'], p['score_sofazinho'],
+                                        p['populacao_por_franquia'])
+    _, mercado = calcular_mercado(pop, sorteio['Classe_AB_PNAD'], sorteio['Penetracao_Internet_PNAD'],
+                                  **{nome: p[nome] for nome in DEPENDENCIAS['mercado']})
+    receita_mensal = mercado * p['ticket_medio'] / 12
+
+    padrao_corrigida, sofazinho_corrigida, _, _ = corrigir_por_faturamento(
+        pop, padrao, sofazinho, receita_mensal, p['faturamento_minimo_padrao'])
+    total_corrigida = padrao_corrigida + sofazinho_corrigida
+    _, payback = calcular_payback(receita_mensal, padrao_corrigida, total_corrigida)
+
+    # Payback médio das cidades com franquia, como na aba de insights
+    com_payback = payback > 0
+    payback_medio = np.where(com_payback, payback, 0).sum(axis=1) / np.maximum(com_payback.sum(axis=1), 1)
+    return total_corrigida, payback_medio
+
+
+def _percentis_histograma(histograma, percentis):
+    """Percentis (inverted CDF) por linha de um histograma de contagens inteiras"""
+    acumulado = np.cumsum(histograma, axis=1)
+    total = acumulado[:, -1:]
+    return np.column_stack([
+        (acumulado < np.ceil(total * q / 100)).sum(axis=1) for q in percentis
+    ])
+
+
+def simular(df, n_simulacoes=SIMULACOES_PADRAO, semente=SEMENTE_PADRAO, parametros=None,
+            tamanho_lote=LOTE_PADRAO):
+    """Percentis do potencial total, por UF e por cidade em N sorteios"""
+    parametros = {**PARAMETROS_PADRAO, **(parametros or {})}
+    rng = np.random.default_rng(semente)
+
+    entradas = {coluna: df[coluna].to_numpy(dtype=np.float64)
+                for coluna in ['Populacao_2022', *INCERTEZAS_ENTRADAS]}
+    entradas['fator_regional'] = fator_regional(df['Regiao'])
+
+    # Matriz indicadora município × UF: soma por UF vira produto matricial
+    uf = pd.Categorical(df['UF'].astype(str))
+    indicadora = np.zeros((len(df), len(uf.categories)))
+    indicadora[np.arange(len(df)), uf.codes] = 1.0
+
+    totais, paybacks, totais_uf = [], [], []
+    histograma = np.zeros((len(df), 1), dtype=np.int64)
+    indice_cidade = np.arange(len(df))
+
+    # Lotes limitam a memória a tamanho_lote × municípios por matriz;
+    # mesma semente e mesmo lote reproduzem exatamente os percentis
+    for inicio in range(0, n_simulacoes, tamanho_lote):
+        n_sorteios = min(tamanho_lote, n_simulacoes - inicio)
+        total_corrigida, payback_medio = simular_lote(entradas, parametros, rng, n_sorteios)
+
+        totais.append(total_corrigida.sum(axis=1))
+        paybacks.append(payback_medio)
+        totais_uf.append(total_corrigida @ indicadora)
+
+        # Histograma por cidade: percentis exatos sem guardar todos os sorteios
+        largura = max(histograma.shape[1], int(total_corrigida.max()) + 1)
+        if largura > histograma.shape[1]:
+            histograma = np.pad(histograma, ((0, 0), (0, largura - histograma.shape[1])))
+        posicoes = (indice_cidade * largura + total_corrigida).ravel()
+        histograma += np.bincount(posicoes, minlength=len(df) * largura).reshape(len(df), largura)
+
+    totais = np.concatenate(totais)
+    paybacks = np.concatenate(paybacks)
+    totais_uf = np.concatenate(totais_uf)
+    rotulos = [f'P{q}' for q in PERCENTIS]
+
+    por_uf = pd.DataFrame(
+        np.percentile(totais_uf, PERCENTIS, axis=0, method='inverted_cdf').T.astype(np.int64),
+        index=pd.Index(uf.categories, name='UF'), columns=rotulos
+    )
+    por_cidade = pd.DataFrame(_percentis_histograma(histograma, PERCENTIS), index=df.index, columns=rotulos)
+    por_cidade.insert(0, 'Municipio', df['Municipio'].to_numpy())
+    por_cidade.insert(1, 'UF', df['UF'].astype(str).to_numpy())
+
+    return {
+        'n_simulacoes': n_simulacoes,
+        'semente': semente,
+        'total': dict(zip(rotulos, np.percentile(totais, PERCENTIS, method='inverted_cdf').astype(np.int64))),
+        'payback': dict(zip(rotulos, np.percentile(paybacks, PERCENTIS))),
+        'por_uf': por_uf,
+        'por_cidade': por_cidade
+    }
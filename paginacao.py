@@ -0,0 +1,32 @@
+"""
+Paginação de Tabelas - Sofá Novo de Novo
+Ordenação e filtro sobre vetores de posições; só a página visível vira DataFrame
+"""
+
+import math
+
+import pandas as pd
+
+TAMANHOS_PAGINA = (25, 50, 100, 250)
+
+
+def ordenar_posicoes(valores, crescente=True):
+    """Posições que ordenam a coluna (estável, ausentes no fim; categorias na ordem declarada)"""
+    serie = pd.Series(valores).reset_index(drop=True)
+    return serie.sort_values(ascending=crescente, kind='stable', na_position='last').index.to_numpy()
+
+
+def filtrar_posicoes(posicoes, mascara):
+    """Mantém, na ordem dada, só as posições que passam no filtro"""
+    return posicoes[mascara[posicoes]]
+
+
+def total_paginas(n_linhas, tamanho_pagina):
+    """Número de páginas (ao menos uma, mesmo sem linhas)"""
+    return max(1, math.ceil(n_linhas / tamanho_pagina))
+
+
+def fatiar_pagina(posicoes, pagina, tamanho_pagina):
+    """Posições da página (numerada a partir de 1)"""
+    inicio = (pagina - 1) * tamanho_pagina
+    return posicoes[inicio:inicio + tamanho_pagina]
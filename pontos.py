@@ -0,0 +1,44 @@
+"""
+Decimação de Pontos - Sofá Novo de Novo
+Agregação em grade para gráficos de pontos densos (municípios e bairros)
+"""
+
+import numpy as np
+
+# Acima disso os pontos são agregados: WebGL fica fluido e o payload limitado
+MAX_PONTOS = 20000
+
+
+def _celula(valores, lado):
+    """Índice da faixa (0 .. lado-1) de cada valor dentro da extensão dos dados"""
+    minimo, maximo = valores.min(), valores.max()
+    escala = lado / (maximo - minimo) if maximo > minimo else 0.0
+    return np.clip(((valores - minimo) * escala).astype(np.int64), 0, lado - 1)
+
+
+def decimar_pontos(x, y, prioridade=None, max_pontos=MAX_PONTOS):
+    """Um representante por célula da grade (maior prioridade) e quantos pontos ele resume"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= max_pontos:
+        return np.arange(n), np.ones(n, dtype=np.int64)
+
+    # Grade lado x lado sobre a extensão dos dados: no máximo max_pontos células
+    lado = max(1, int(np.sqrt(max_pontos)))
+    celula = _celula(x, lado) * lado + _celula(y, lado)
+    prioridade = np.zeros(n) if prioridade is None else np.asarray(prioridade, dtype=np.float64)
+
+    # Ordena por célula e, dentro dela, pela prioridade decrescente
+    ordem = np.lexsort((-prioridade, celula))
+    celulas = celula[ordem]
+    inicio = np.flatnonzero(np.r_[True, celulas[1:] != celulas[:-1]])
+    return ordem[inicio], np.diff(np.r_[inicio, n])
+
+
+def decimar_df(df, x, y, prioridade=None, max_pontos=MAX_PONTOS):
+    """Linhas representativas do DataFrame com a coluna Pontos_Agregados"""
+    posicoes, contagem = decimar_pontos(
+        df[x], df[y], None if prioridade is None else df[prioridade], max_pontos
+    )
+    return df.iloc[posicoes].assign(Pontos_Agregados=contagem)
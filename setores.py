@@ -0,0 +1,114 @@
+"""
+Score por Setor Censitário - Sofá Novo de Novo
+Setores agregados por bairro e score dos bairros com os fatores do modelo municipal
+
+Tabela de setores (CSV ou Parquet), uma linha por setor censitário:
+    Codigo_Setor, Codigo_IBGE (município), bairro, populacao, domicilios,
+    domicilios_ab (domicílios classe A/B), renda_total (R$/mês dos domicílios),
+    area_km2, lat, lon (centroide do setor)
+
+Score bruto = População × F_Classe × F_Renda × F_Densidade; o score final
+(0-100) é o percentil do bairro dentro do seu município.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from bairros import normalizar_nome
+from modelo_score import CLASSE_AB_BASE
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_SETORES = os.path.join(RAIZ, 'dados', 'setores', 'setores.parquet')
+
+COLUNAS_SETORES = ['Codigo_Setor', 'Codigo_IBGE', 'bairro', 'populacao', 'domicilios', 'domicilios_ab',
+                   'renda_total', 'area_km2', 'lat', 'lon']
+
+# Densidade de referência (hab/km²) e teto do fator: adensamento acima disso não rende mais
+DENSIDADE_BASE = 7000
+TETO_DENSIDADE = 1.5
+
+
+def carregar_setores(caminho=ARQUIVO_SETORES):
+    """Tabela de setores (só as colunas usadas); None se o arquivo não existir"""
+    if not os.path.exists(caminho):
+        return None
+    if caminho.endswith('.parquet'):
+        return pd.read_parquet(caminho, columns=COLUNAS_SETORES)
+    return pd.read_csv(caminho, usecols=COLUNAS_SETORES)
+
+
+def _dividir(numerador, denominador):
+    """Divisão elemento a elemento com zero onde o denominador não é positivo"""
+    saida = np.zeros(np.broadcast(numerador, denominador).shape)
+    np.divide(numerador, denominador, out=saida, where=denominador > 0)
+    return saida
+
+
+def agregar_bairros(setores):
+    """Soma dos setores por município e bairro (nome normalizado); centroide ponderado pela população"""
+    # Normaliza só os nomes distintos: milhares, não centenas de milhares
+    codigos, nomes = pd.factorize(setores['bairro'])
+    chaves = np.array([normalizar_nome(nome) for nome in nomes] + [''], dtype=object)
+
+    populacao = setores['populacao'].to_numpy(dtype=np.float64)
+    agregado = pd.DataFrame({
+        'Codigo_IBGE': setores['Codigo_IBGE'].to_numpy(dtype=np.int64),
+        'chave': chaves[codigos],  # Código -1 (sem bairro) cai na chave vazia
+        'bairro': setores['bairro'].to_numpy(),
+        'populacao': populacao,
+        'domicilios': setores['domicilios'].to_numpy(dtype=np.float64),
+        'domicilios_ab': setores['domicilios_ab'].to_numpy(dtype=np.float64),
+        'renda_total': setores['renda_total'].to_numpy(dtype=np.float64),
+        'area_km2': setores['area_km2'].to_numpy(dtype=np.float64),
+        'lat_pop': setores['lat'].to_numpy(dtype=np.float64) * populacao,
+        'lon_pop': setores['lon'].to_numpy(dtype=np.float64) * populacao,
+        'setores': 1
+    })
+    agregado = agregado[agregado['chave'] != ''].groupby(['Codigo_IBGE', 'chave'], sort=True).agg(
+        bairro=('bairro', 'first'), populacao=('populacao', 'sum'), domicilios=('domicilios', 'sum'),
+        domicilios_ab=('domicilios_ab', 'sum'), renda_total=('renda_total', 'sum'),
+        area_km2=('area_km2', 'sum'), lat_pop=('lat_pop', 'sum'), lon_pop=('lon_pop', 'sum'),
+        setores=('setores', 'sum')
+    ).reset_index()
+
+    populacao = agregado['populacao'].to_numpy()
+    return agregado.assign(
+        lat=_dividir(agregado.pop('lat_pop').to_numpy(), populacao),
+        lon=_dividir(agregado.pop('lon_pop').to_numpy(), populacao)
+    )
+
+
+def pontuar_bairros(bairros_agregados):
+    """Classe A/B, renda, densidade, score bruto e score 0-100 (percentil no município)"""
+    municipio = bairros_agregados['Codigo_IBGE']
+    populacao = bairros_agregados['populacao'].to_numpy()
+    domicilios = bairros_agregados['domicilios'].to_numpy()
+    renda_total = bairros_agregados['renda_total'].to_numpy()
+
+    classe_ab = 100 * _dividir(bairros_agregados['domicilios_ab'].to_numpy(), domicilios)
+    renda_media = _dividir(renda_total, domicilios)
+    densidade = _dividir(populacao, bairros_agregados['area_km2'].to_numpy())
+
+    # Renda relativa à do município (mesmo papel do PIB per capita no score municipal)
+    por_municipio = bairros_agregados.groupby('Codigo_IBGE')
+    renda_municipio = _dividir(por_municipio['renda_total'].transform('sum').to_numpy(),
+                               por_municipio['domicilios'].transform('sum').to_numpy())
+
+    score_bruto = (populacao * (classe_ab / CLASSE_AB_BASE) * _dividir(renda_media, renda_municipio) *
+                   np.minimum(densidade / DENSIDADE_BASE, TETO_DENSIDADE))
+    score = pd.Series(score_bruto, index=bairros_agregados.index).groupby(municipio).rank(pct=True) * 100
+
+    return bairros_agregados.assign(
+        classe_ab_pct=classe_ab,
+        renda_media=renda_media,
+        densidade=densidade,
+        score_bruto=score_bruto,
+        score=np.round(score.to_numpy()).astype(np.int64)
+    )
+
+
+def pontuar_setores(setores):
+    """Agrega e pontua todos os bairros de todos os municípios da tabela de uma vez"""
+    return pontuar_bairros(agregar_bairros(setores))
@@ -0,0 +1,396 @@
+"""
+Snapshots de Análise - Sofá Novo de Novo
+Formato colunar (Arrow IPC) com schema explícito e leitura via memory-map
+Catálogo persistido das execuções com hash de conteúdo
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as pa_ipc
+
+EXTENSAO_SNAPSHOT = ".arrow"
+CAMINHO_CATALOGO = "catalogo_snapshots.json"
+VERSAO_SCHEMA = 3
+
+# Tipos de análise por prefixo de arquivo, em ordem de prioridade
+PREFIXOS_ANALISE = {
+    'analise_corrigida_faturamento': 'corrigida',
+    'analise_com_franquias_atuais': 'nao_corrigida'
+}
+
+# Cache do catálogo por processo, relido só quando o arquivo muda; a trava protege
+# o cache e a reconstrução do catálogo entre sessões (threads) do mesmo processo
+_cache_catalogo = {'mtime': None, 'caminho': None, 'entradas': []}
+_trava_catalogo = threading.RLock()
+
+# Schema de leitura do CSV (colunas extras são inferidas)
+SCHEMA_COLUNAS = {
+    'Codigo_IBGE': pa.int64(),
+    'Municipio': pa.string(),
+    'UF': pa.string(),
+    'Regiao': pa.string(),
+    'Populacao_2022': pa.int64(),
+    'PIB_per_capita_Calibrado': pa.float64(),
+    'IDH_Calibrado': pa.float64(),
+    'Classe_AB_PNAD': pa.float64(),
+    'Penetracao_Internet_PNAD': pa.float64(),
+    'Interesse_Google_Trends': pa.int64(),
+    'Score_Realista': pa.float64(),
+    'Franquias_Padrao_Realista': pa.int64(),
+    'Franquias_Sofazinho_Realista': pa.int64(),
+    'Total_Franquias_Realista': pa.int64(),
+    'Tem_Franquia': pa.bool_(),
+    'Franquias_Atuais': pa.float64(),
+    'Franquias_Padrao_Adicional': pa.float64(),
+    'Franquias_Sofazinho_Adicional': pa.int64(),
+    'Total_Franquias_Adicional': pa.float64(),
+    'Classificacao_Realista': pa.string(),
+    'Ranking_Realista': pa.int64(),
+    'Pop_Classe_AB': pa.int64(),
+    'Mercado_Total_Servicos': pa.int64(),
+    'Franquias_Padrao_Corrigida': pa.int64(),
+    'Franquias_Sofazinho_Corrigida': pa.int64(),
+    'Total_Franquias_Corrigida': pa.int64(),
+    'Faturamento_Mensal_Estimado': pa.float64(),
+    'Tipo_Recomendado': pa.string(),
+    'Franquias_Padrao_Adicional_Corrigida': pa.float64(),
+    'Franquias_Sofazinho_Adicional_Corrigida': pa.int64(),
+    'Total_Franquias_Adicional_Corrigida': pa.float64(),
+    'Classificacao_Corrigida': pa.string(),
+    'Ranking_Corrigido': pa.int64(),
+    'Payback_Meses': pa.float64()
+}
+
+# Schema compacto canônico em memória: categorias, int32/float32 e bool
+# (contagens gravadas como float no CSV viram int32; cast falha se não forem inteiras)
+CATEGORIA = pa.dictionary(pa.int8(), pa.string())
+SCHEMA_COMPACTO = {
+    'Codigo_IBGE': pa.int32(),
+    'UF': CATEGORIA,
+    'Regiao': CATEGORIA,
+    'Populacao_2022': pa.int32(),
+    # Entradas do modelo e score mantêm float64: os cálculos truncam com int()
+    # e a perda de precisão do float32 muda resultados na fronteira
+    'PIB_per_capita_Calibrado': pa.float64(),
+    'IDH_Calibrado': pa.float64(),
+    'Classe_AB_PNAD': pa.float64(),
+    'Penetracao_Internet_PNAD': pa.float64(),
+    'Interesse_Google_Trends': pa.int32(),
+    'Score_Realista': pa.float64(),
+    'Franquias_Padrao_Realista': pa.int32(),
+    'Franquias_Sofazinho_Realista': pa.int32(),
+    'Total_Franquias_Realista': pa.int32(),
+    'Tem_Franquia': pa.bool_(),
+    'Franquias_Atuais': pa.int32(),
+    'Franquias_Padrao_Adicional': pa.int32(),
+    'Franquias_Sofazinho_Adicional': pa.int32(),
+    'Total_Franquias_Adicional': pa.int32(),
+    'Classificacao_Realista': CATEGORIA,
+    'Ranking_Realista': pa.int32(),
+    'Pop_Classe_AB': pa.int32(),
+    'Mercado_Total_Servicos': pa.int32(),
+    'Franquias_Padrao_Corrigida': pa.int32(),
+    'Franquias_Sofazinho_Corrigida': pa.int32(),
+    'Total_Franquias_Corrigida': pa.int32(),
+    'Faturamento_Mensal_Estimado': pa.float32(),
+    'Tipo_Recomendado': CATEGORIA,
+    'Franquias_Padrao_Adicional_Corrigida': pa.int32(),
+    'Franquias_Sofazinho_Adicional_Corrigida': pa.int32(),
+    'Total_Franquias_Adicional_Corrigida': pa.int32(),
+    'Classificacao_Corrigida': CATEGORIA,
+    'Ranking_Corrigido': pa.int32(),
+    'Payback_Meses': pa.float32()
+}
+
+
+def caminho_snapshot(caminho_csv):
+    """Caminho do snapshot colunar correspondente a um CSV"""
+    return os.path.splitext(caminho_csv)[0] + EXTENSAO_SNAPSHOT
+
+
+def compactar_tabela(tabela):
+    """Aplica o schema compacto canônico às colunas conhecidas"""
+    campos = []
+    for campo in tabela.schema:
+        tipo = SCHEMA_COMPACTO.get(campo.name, campo.type)
+        campos.append(pa.field(campo.name, tipo))
+
+    metadata = {b'versao_schema': str(VERSAO_SCHEMA).encode()}
+    return tabela.cast(pa.schema(campos)).replace_schema_metadata(metadata)
+
+
+def _versao_schema(tabela):
+    """Versão do schema gravada nos metadados do snapshot"""
+    schema = tabela if isinstance(tabela, pa.Schema) else tabela.schema
+    metadata = schema.metadata or {}
+    return int(metadata.get(b'versao_schema', b'1'))
+
+
+def ler_csv(caminho_csv):
+    """Lê um CSV de análise já no schema compacto"""
+    opcoes = pa_csv.ConvertOptions(column_types=SCHEMA_COLUNAS)
+    return compactar_tabela(pa_csv.read_csv(caminho_csv, convert_options=opcoes))
+
+
+def _gravar_atomico(caminho_destino, gravar):
+    """Grava via gravar(caminho_tmp) em um temporário único ao lado do destino e o substitui de uma vez"""
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(caminho_destino)),
+                                     prefix=os.path.basename(caminho_destino) + ".", suffix=".tmp",
+                                     delete=False) as arquivo:
+        caminho_tmp = arquivo.name
+    try:
+        gravar(caminho_tmp)
+        os.replace(caminho_tmp, caminho_destino)
+    except BaseException:
+        os.remove(caminho_tmp)
+        raise
+
+
+def importar_csv(caminho_csv, caminho_destino=None):
+    """Converte um CSV de análise para snapshot Arrow com schema explícito"""
+    tabela = ler_csv(caminho_csv)
+    caminho_destino = caminho_destino or caminho_snapshot(caminho_csv)
+
+    # Sem compressão: permite leitura zero-copy via memory-map
+    def gravar(caminho_tmp):
+        with pa.OSFile(caminho_tmp, "wb") as sink:
+            with pa_ipc.new_file(sink, tabela.schema) as writer:
+                writer.write_table(tabela)
+
+    _gravar_atomico(caminho_destino, gravar)
+    return caminho_destino
+
+
+def exportar_csv(caminho_snapshot_arrow, caminho_csv):
+    """Exporta um snapshot Arrow de volta para CSV"""
+    tabela = ler_tabela(caminho_snapshot_arrow)
+
+    # CSV não suporta dicionários: decodifica as categorias
+    campos = [pa.field(c.name, c.type.value_type if pa.types.is_dictionary(c.type) else c.type)
+              for c in tabela.schema]
+    pa_csv.write_csv(tabela.cast(pa.schema(campos)), caminho_csv)
+    return caminho_csv
+
+
+def ler_tabela(caminho, colunas=None):
+    """Lê snapshot Arrow via memory-map, materializando só as colunas pedidas"""
+    # Os buffers da tabela apontam direto para o arquivo mapeado (zero-copy)
+    source = pa.memory_map(caminho, "r")
+    tabela = pa_ipc.open_file(source).read_all()
+
+    if _versao_schema(tabela) < VERSAO_SCHEMA:
+        tabela = compactar_tabela(tabela)
+
+    if colunas is not None:
+        tabela = tabela.select([c for c in colunas if c in tabela.column_names])
+
+    return tabela
+
+
+def para_pandas(tabela):
+    """Converte tabela Arrow em DataFrame preservando categorias e tipos estreitos"""
+    return tabela.to_pandas(split_blocks=True)
+
+
+def ler_snapshot(caminho, colunas=None):
+    """Lê snapshot Arrow como DataFrame"""
+    return para_pandas(ler_tabela(caminho, colunas))
+
+
+def _snapshot_desatualizado(caminho_csv, caminho_arrow):
+    """Indica se o snapshot Arrow precisa ser (re)gerado a partir do CSV"""
+    if not os.path.exists(caminho_arrow) or os.path.getmtime(caminho_arrow) < os.path.getmtime(caminho_csv):
+        return True
+    source = pa.memory_map(caminho_arrow, "r")
+    return _versao_schema(pa_ipc.open_file(source).schema) < VERSAO_SCHEMA
+
+
+def carregar_analise(caminho, colunas=None):
+    """Carrega uma análise, preferindo o snapshot colunar ao CSV"""
+    if caminho.endswith(EXTENSAO_SNAPSHOT):
+        return ler_snapshot(caminho, colunas)
+
+    arrow = caminho_snapshot(caminho)
+    if _snapshot_desatualizado(caminho, arrow):
+        try:
+            importar_csv(caminho, arrow)
+        except OSError:
+            # Diretório somente leitura: segue direto pelo CSV
+            tabela = ler_csv(caminho)
+            if colunas is not None:
+                tabela = tabela.select([c for c in colunas if c in tabela.column_names])
+            return para_pandas(tabela)
+
+    return ler_snapshot(arrow, colunas)
+
+
+def relatorio_memoria(df):
+    """Memória por coluna no schema compacto vs tipos largos (object/int64/float64)"""
+    linhas = []
+    for coluna in df.columns:
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(serie):
+            larga = serie.astype(object)
+        elif pd.api.types.is_bool_dtype(serie):
+            larga = serie
+        elif pd.api.types.is_integer_dtype(serie):
+            larga = serie.astype('int64')
+        else:
+            larga = serie.astype('float64')
+
+        linhas.append({
+            'Coluna': coluna,
+            'Tipo': str(serie.dtype),
+            'Bytes Compacto': int(serie.memory_usage(deep=True, index=False)),
+            'Bytes Original': int(larga.memory_usage(deep=True, index=False))
+        })
+
+    return pd.DataFrame(linhas)
+
+
+def hash_conteudo(caminho):
+    """Hash SHA-256 do conteúdo de um arquivo"""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _tipo_analise(caminho):
+    """Identifica o tipo de análise pelo prefixo do arquivo"""
+    nome = os.path.basename(caminho)
+    for prefixo, tipo in PREFIXOS_ANALISE.items():
+        if nome.startswith(prefixo + "_"):
+            return tipo
+    return None
+
+
+def _timestamp_execucao(caminho):
+    """Data/hora da execução a partir do nome (..._AAAAMMDD_HHMMSS)"""
+    base = os.path.splitext(os.path.basename(caminho))[0]
+    try:
+        data = datetime.strptime("_".join(base.split("_")[-2:]), "%Y%m%d_%H%M%S")
+    except ValueError:
+        data = datetime.fromtimestamp(os.path.getmtime(caminho))
+    return data.isoformat(timespec="seconds")
+
+
+def ler_catalogo(caminho_catalogo=CAMINHO_CATALOGO):
+    """Lê as entradas do catálogo de snapshots"""
+    try:
+        mtime = os.path.getmtime(caminho_catalogo)
+    except OSError:
+        return []
+
+    with _trava_catalogo:
+        if _cache_catalogo['caminho'] != caminho_catalogo or _cache_catalogo['mtime'] != mtime:
+            with open(caminho_catalogo, encoding="utf-8") as f:
+                _cache_catalogo['entradas'] = json.load(f).get('snapshots', [])
+            _cache_catalogo['mtime'] = mtime
+            _cache_catalogo['caminho'] = caminho_catalogo
+        return _cache_catalogo['entradas']
+
+
+def _gravar_catalogo(entradas, caminho_catalogo):
+    """Grava o catálogo de forma atômica"""
+    def gravar(caminho_tmp):
+        with open(caminho_tmp, "w", encoding="utf-8") as f:
+            json.dump({'versao': 1, 'snapshots': entradas}, f, ensure_ascii=False, indent=2)
+
+    _gravar_atomico(caminho_catalogo, gravar)
+
+
+def _entrada_catalogo(caminho, caminho_catalogo):
+    """Entrada do catálogo de uma execução (converte o CSV para snapshot se preciso)"""
+    tipo = _tipo_analise(caminho)
+    if tipo is None:
+        raise ValueError(f"Prefixo de arquivo desconhecido: {caminho}")
+
+    if caminho.endswith(EXTENSAO_SNAPSHOT):
+        linhas = ler_tabela(caminho).num_rows
+    else:
+        linhas = ler_tabela(importar_csv(caminho)).num_rows
+
+    diretorio = os.path.dirname(os.path.abspath(caminho_catalogo))
+    return {
+        'arquivo': os.path.relpath(os.path.abspath(caminho), diretorio),
+        'tipo': tipo,
+        'timestamp': _timestamp_execucao(caminho),
+        'linhas': linhas,
+        'versao_schema': VERSAO_SCHEMA,
+        'hash': hash_conteudo(caminho)
+    }
+
+
+def registrar_snapshot(caminho, caminho_catalogo=CAMINHO_CATALOGO):
+    """Registra (ou atualiza) uma execução no catálogo"""
+    entrada = _entrada_catalogo(caminho, caminho_catalogo)
+    with _trava_catalogo:
+        entradas = [e for e in ler_catalogo(caminho_catalogo) if e['arquivo'] != entrada['arquivo']]
+        entradas.append(entrada)
+        entradas.sort(key=lambda e: e['timestamp'])
+        _gravar_catalogo(entradas, caminho_catalogo)
+    return entrada
+
+
+def reconstruir_catalogo(diretorio=".", caminho_catalogo=CAMINHO_CATALOGO):
+    """Recria o catálogo varrendo o diretório (usado apenas na primeira execução)"""
+    # Todas as entradas em memória e uma única gravação: quem lê nunca vê o catálogo pela metade
+    entradas = [
+        _entrada_catalogo(caminho, caminho_catalogo)
+        for prefixo in PREFIXOS_ANALISE
+        for caminho in sorted(glob.glob(os.path.join(diretorio, f"{prefixo}_*.csv")))
+    ]
+    entradas.sort(key=lambda e: e['timestamp'])
+    with _trava_catalogo:
+        _gravar_catalogo(entradas, caminho_catalogo)
+        return ler_catalogo(caminho_catalogo)
+
+
+def snapshot_vigente(caminho_catalogo=CAMINHO_CATALOGO):
+    """Execução mais recente do catálogo, priorizando análises corrigidas"""
+    entradas = ler_catalogo(caminho_catalogo)
+    if not entradas and not os.path.exists(caminho_catalogo):
+        # Primeira execução: só uma sessão reconstrói; as demais esperam e leem o resultado
+        with _trava_catalogo:
+            if os.path.exists(caminho_catalogo):
+                entradas = ler_catalogo(caminho_catalogo)
+            else:
+                entradas = reconstruir_catalogo(os.path.dirname(caminho_catalogo) or ".", caminho_catalogo)
+
+    for tipo in PREFIXOS_ANALISE.values():
+        do_tipo = [e for e in entradas if e['tipo'] == tipo]
+        if do_tipo:
+            entrada = dict(do_tipo[-1])
+            diretorio = os.path.dirname(caminho_catalogo)
+            entrada['caminho'] = os.path.join(diretorio, entrada['arquivo']) if diretorio else entrada['arquivo']
+            return entrada
+    return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("importar", "exportar", "reconstruir"):
+        print("Uso: python snapshot_dados.py importar <arquivo.csv>")
+        print("     python snapshot_dados.py exportar <arquivo.arrow> [destino.csv]")
+        print("     python snapshot_dados.py reconstruir")
+        sys.exit(1)
+
+    if sys.argv[1] == "importar":
+        entrada = registrar_snapshot(sys.argv[2])
+        print(f"✅ Snapshot registrado: {entrada['arquivo']} ({entrada['linhas']:,} linhas, hash {entrada['hash'][:12]})")
+    elif sys.argv[1] == "reconstruir":
+        print(f"✅ Catálogo reconstruído: {len(reconstruir_catalogo())} snapshot(s)")
+    else:
+        destino = sys.argv[3] if len(sys.argv) > 3 else os.path.splitext(sys.argv[2])[0] + ".csv"
+        print(f"✅ CSV exportado: {exportar_csv(sys.argv[2], destino)}")
@@ -0,0 +1,106 @@
+"""Bacias de sofázinho numa linha de municípios com o resultado conhecido"""
+
+import numpy as np
+import pandas as pd
+
+import bacias
+from bacias import ATENDIDO_POR_FRANQUIA, MEMBRO, POLO, SEM_BACIA
+
+# Municípios no equador (1° de longitude ≈ 111 km); alcance padrão = 30 / 1.3 ≈ 23 km ≈ 0.21°
+MUNICIPIOS = pd.DataFrame([
+    # nome, lon, população, score, franquia, sofázinho
+    ('Franquia', 0.00, 300000, 90000, True, True),
+    ('Vizinho da franquia', 0.10, 15000, 5000, False, True),
+    ('Longe da franquia', 0.30, 8000, 3000, False, False),
+    ('Polo 1', 1.00, 60000, 20000, False, True),
+    ('Perto do polo 1', 1.12, 9000, 3000, False, False),
+    ('Perto do polo 2', 1.20, 9000, 3000, False, False),
+    ('Polo 2', 1.30, 40000, 15000, False, True),
+    ('Bacia nova', 3.00, 12000, 6000, False, False),
+    ('Membro A', 3.10, 6000, 4000, False, False),
+    ('Membro B', 3.15, 5000, 3000, False, False),
+    ('Primeiro polo', 4.00, 15000, 8000, False, False),
+    ('Entre os dois', 4.15, 6000, 5000, False, False),
+    ('Segundo polo', 4.30, 14000, 7000, False, False),
+    ('Isolado', 6.00, 19000, 11000, False, False),
+], columns=['nome', 'lon', 'populacao', 'score', 'franquia', 'sofazinho'])
+
+# Posição do polo (ou da cidade com franquia) e papel esperados
+ESPERADO = {
+    'Franquia': ('Franquia', SEM_BACIA),  # A cidade com franquia atende os vizinhos, não é polo
+    'Vizinho da franquia': ('Franquia', ATENDIDO_POR_FRANQUIA),
+    'Longe da franquia': (None, SEM_BACIA),
+    'Polo 1': ('Polo 1', POLO),
+    'Perto do polo 1': ('Polo 1', MEMBRO),
+    'Perto do polo 2': ('Polo 2', MEMBRO),  # Ao alcance dos dois: fica com o mais próximo
+    'Polo 2': ('Polo 2', POLO),
+    'Bacia nova': ('Bacia nova', POLO),
+    'Membro A': ('Bacia nova', MEMBRO),
+    'Membro B': ('Bacia nova', MEMBRO),
+    'Primeiro polo': ('Primeiro polo', POLO),
+    'Entre os dois': ('Primeiro polo', MEMBRO),  # Ao alcance de dois polos novos: o mais populoso
+    'Segundo polo': (None, SEM_BACIA),
+    'Isolado': (None, SEM_BACIA),
+}
+
+
+def _formar(municipios, **opcoes):
+    return bacias.formar_bacias(np.zeros(len(municipios)), municipios['lon'], municipios['populacao'],
+                                municipios['score'], municipios['franquia'], municipios['sofazinho'], **opcoes)
+
+
+def test_bacias_conhecidas():
+    polo, papel, sofazinho_bacia = _formar(MUNICIPIOS)
+    nomes = MUNICIPIOS['nome'].tolist()
+
+    for i, nome in enumerate(nomes):
+        esperado_polo, esperado_papel = ESPERADO[nome]
+        assert (nomes[polo[i]] if polo[i] >= 0 else None) == esperado_polo, nome
+        assert papel[i] == esperado_papel, nome
+
+    # Sofázinhos: a franquia mantém o seu, o vizinho atendido perde, cada polo tem um
+    com_sofazinho = [nome for nome, s in zip(nomes, sofazinho_bacia) if s]
+    assert com_sofazinho == ['Franquia', 'Polo 1', 'Polo 2', 'Bacia nova', 'Primeiro polo']
+
+
+def test_ordem_dos_municipios_nao_muda_as_bacias():
+    polo, papel, sofazinho_bacia = _formar(MUNICIPIOS)
+    ordem = np.random.default_rng(1).permutation(len(MUNICIPIOS))
+    polo_embaralhado, papel_embaralhado, sofazinho_embaralhado = _formar(MUNICIPIOS.iloc[ordem])
+
+    # Posições do embaralhado voltam para as posições originais
+    np.testing.assert_array_equal(np.where(polo_embaralhado >= 0, ordem[polo_embaralhado], -1), polo[ordem])
+    np.testing.assert_array_equal(papel_embaralhado, papel[ordem])
+    np.testing.assert_array_equal(sofazinho_embaralhado, sofazinho_bacia[ordem])
+
+
+def test_distancia_menor_desfaz_as_bacias():
+    # 10 km de carro ≈ 7.7 km em linha reta: ninguém alcança ninguém
+    polo, papel, sofazinho_bacia = _formar(MUNICIPIOS, distancia_km=10)
+
+    assert set(papel[MUNICIPIOS['sofazinho'].to_numpy() & ~MUNICIPIOS['franquia'].to_numpy()]) == {POLO}
+    assert MEMBRO not in papel and ATENDIDO_POR_FRANQUIA not in papel
+    np.testing.assert_array_equal(sofazinho_bacia, MUNICIPIOS['sofazinho'].astype(int))
+
+
+def test_bacias_municipios_sem_centroide_fica_como_esta():
+    df = pd.DataFrame({
+        'Codigo_IBGE': np.arange(1, len(MUNICIPIOS) + 2),
+        'Municipio': MUNICIPIOS['nome'].tolist() + ['Sem malha'],
+        'Franquias_Padrao_Realista': MUNICIPIOS['franquia'].astype(int).tolist() + [0],
+        'Franquias_Sofazinho_Realista': MUNICIPIOS['sofazinho'].astype(int).tolist() + [1],
+        'Franquias_Atuais': [np.nan] * (len(MUNICIPIOS) + 1),
+        'Populacao_2022': MUNICIPIOS['populacao'].tolist() + [30000],
+        'Score_Realista': MUNICIPIOS['score'].tolist() + [13000],
+    })
+    centroides = pd.DataFrame({'Codigo_IBGE': df['Codigo_IBGE'][:-1], 'lat': 0.0, 'lon': MUNICIPIOS['lon']})
+    resultado = bacias.bacias_municipios(df, centroides).set_index('Municipio')
+
+    assert resultado.loc['Sem malha', 'Papel_Bacia'] == 'Sem bacia'
+    assert resultado.loc['Sem malha', 'Franquias_Sofazinho_Bacia'] == 1
+    assert resultado.loc['Entre os dois', 'Codigo_Polo'] == resultado.loc['Primeiro polo', 'Codigo_IBGE']
+    assert resultado.loc['Primeiro polo', 'Populacao_Bacia'] == 15000 + 6000
+    assert resultado.loc['Bacia nova', 'Populacao_Bacia'] == 12000 + 6000 + 5000
+    assert resultado.loc['Franquia', 'Populacao_Bacia'] == 300000 + 15000
+    assert resultado.loc['Membro A', 'Populacao_Bacia'] == 0
+    assert resultado['Franquias_Sofazinho_Bacia'].sum() == 6
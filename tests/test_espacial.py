@@ -0,0 +1,80 @@
+"""Índice espacial contra a matriz de distâncias completa (força bruta)"""
+
+import numpy as np
+import pytest
+
+import espacial
+
+
+def _matriz(lat, lon, lat_consulta, lon_consulta):
+    """Distâncias (consultas x pontos) pela haversine, par a par"""
+    n, m = len(lat_consulta), len(lat)
+    return espacial.distancia_km(np.repeat(lat_consulta, m), np.repeat(lon_consulta, m),
+                                 np.tile(lat, n), np.tile(lon, n)).reshape(n, m)
+
+
+@pytest.fixture
+def pontos():
+    """300 pontos e 80 consultas sorteados na extensão da cidade de São Paulo"""
+    rng = np.random.default_rng(7)
+    lat, lon = rng.uniform(-23.8, -23.4, 300), rng.uniform(-46.9, -46.4, 300)
+    lat_consulta, lon_consulta = rng.uniform(-23.8, -23.4, 80), rng.uniform(-46.9, -46.4, 80)
+    return lat, lon, lat_consulta, lon_consulta
+
+
+@pytest.mark.parametrize('raio_km', [0.5, 2.0, 8.0, 100.0])
+def test_vizinhos_no_raio_igual_a_forca_bruta(pontos, raio_km):
+    lat, lon, lat_consulta, lon_consulta = pontos
+    matriz = _matriz(lat, lon, lat_consulta, lon_consulta)
+    ponteiros, posicoes, distancias = espacial.vizinhos_no_raio(
+        espacial.indexar(lat, lon), lat_consulta, lon_consulta, raio_km)
+
+    assert len(ponteiros) == len(lat_consulta) + 1
+    assert ponteiros[0] == 0 and ponteiros[-1] == len(posicoes) == len(distancias)
+    for i in range(len(lat_consulta)):
+        faixa = slice(ponteiros[i], ponteiros[i + 1])
+        esperado = np.flatnonzero(matriz[i] <= raio_km)
+        assert sorted(posicoes[faixa]) == sorted(esperado)
+        # Do mais próximo ao mais distante, com a distância de cada ponto
+        assert np.all(np.diff(distancias[faixa]) >= 0)
+        np.testing.assert_allclose(distancias[faixa], matriz[i, posicoes[faixa]], atol=1e-9)
+
+
+@pytest.mark.parametrize('raio_km', [0.5, 2.0, 8.0])
+def test_contar_no_raio_igual_a_forca_bruta(pontos, raio_km):
+    lat, lon, lat_consulta, lon_consulta = pontos
+    matriz = _matriz(lat, lon, lat_consulta, lon_consulta)
+    contagem = espacial.contar_no_raio(espacial.indexar(lat, lon), lat_consulta, lon_consulta, raio_km)
+    np.testing.assert_array_equal(contagem, (matriz <= raio_km).sum(axis=1))
+
+
+@pytest.mark.parametrize('celula_km', [None, 0.05, 50.0])
+def test_k_mais_proximos_igual_a_forca_bruta(pontos, celula_km):
+    lat, lon, lat_consulta, lon_consulta = pontos
+    matriz = _matriz(lat, lon, lat_consulta, lon_consulta)
+    # Célula minúscula obriga o raio a dobrar muitas vezes; célula enorme, nenhuma
+    posicoes, distancias = espacial.k_mais_proximos(
+        espacial.indexar(lat, lon, celula_km), lat_consulta, lon_consulta, k=5)
+
+    np.testing.assert_array_equal(posicoes, np.argsort(matriz, axis=1)[:, :5])
+    np.testing.assert_allclose(distancias, np.sort(matriz, axis=1)[:, :5], atol=1e-9)
+
+
+def test_k_maior_que_a_quantidade_de_pontos():
+    indice = espacial.indexar([-23.5, -23.6], [-46.6, -46.7])
+    posicoes, distancias = espacial.k_mais_proximos(indice, [-23.5], [-46.6], k=4)
+
+    np.testing.assert_array_equal(posicoes, [[0, 1, -1, -1]])
+    assert distancias[0, 0] == 0 and np.isfinite(distancias[0, 1])
+    assert np.all(np.isinf(distancias[0, 2:]))
+
+
+def test_pontos_distantes_alem_da_vizinhanca():
+    # Consulta do outro lado do planeta: o raio dobra até cobrir a esfera inteira
+    indice = espacial.indexar([-23.5, -23.51, -23.52], [-46.6, -46.61, -46.62])
+    posicao, distancia = espacial.mais_proximo(indice, [23.5], [133.4])
+
+    esperado = espacial.distancia_km(np.full(3, 23.5), np.full(3, 133.4),
+                                     [-23.5, -23.51, -23.52], [-46.6, -46.61, -46.62])
+    assert posicao[0] == np.argmin(esperado)
+    assert distancia[0] == pytest.approx(esperado.min())
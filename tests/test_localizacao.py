@@ -0,0 +1,99 @@
+"""Guloso preguiçoso contra o guloso simples e a busca exaustiva em poucos locais"""
+
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+import espacial
+import localizacao
+
+
+def _cobertura(ponteiros, pontos, peso, locais, coberto=None):
+    """Peso coberto pelos locais (mais o já coberto)"""
+    marcado = np.zeros(len(peso), dtype=bool) if coberto is None else coberto.copy()
+    for local in locais:
+        marcado[pontos[ponteiros[local]:ponteiros[local + 1]]] = True
+    return float(peso[marcado].sum())
+
+
+def _guloso_simples(ponteiros, pontos, peso, k):
+    """Guloso de referência: recalcula o ganho de todos os locais a cada passo"""
+    escolhidos = []
+    for _ in range(k):
+        base = _cobertura(ponteiros, pontos, peso, escolhidos)
+        ganhos = [_cobertura(ponteiros, pontos, peso, escolhidos + [local]) - base
+                  for local in range(len(ponteiros) - 1)]
+        if max(ganhos) <= 0:
+            break
+        escolhidos.append(int(np.argmax(ganhos)))
+    return escolhidos
+
+
+def _instancia(semente, n_locais):
+    """Demanda e locais sorteados numa área de ~10 km, pesos contínuos (sem empates)"""
+    rng = np.random.default_rng(semente)
+    lat_d, lon_d = rng.uniform(-23.60, -23.50, 120), rng.uniform(-46.70, -46.60, 120)
+    lat_l, lon_l = rng.uniform(-23.60, -23.50, n_locais), rng.uniform(-46.70, -46.60, n_locais)
+    return lat_d, lon_d, rng.uniform(1, 100, 120), lat_l, lon_l
+
+
+def test_conjuntos_cobertura_igual_a_forca_bruta():
+    lat_d, lon_d, _, lat_l, lon_l = _instancia(0, 8)
+    ponteiros, pontos = localizacao.conjuntos_cobertura(lat_d, lon_d, lat_l, lon_l, 2.0)
+    for local in range(8):
+        distancia = espacial.distancia_km(np.full(len(lat_d), lat_l[local]), np.full(len(lat_d), lon_l[local]),
+                                          lat_d, lon_d)
+        assert sorted(pontos[ponteiros[local]:ponteiros[local + 1]]) == list(np.flatnonzero(distancia <= 2.0))
+
+
+@pytest.mark.parametrize('semente', range(10))
+@pytest.mark.parametrize('n_locais', [6, 8])
+def test_guloso_contra_busca_exaustiva(semente, n_locais):
+    lat_d, lon_d, peso, lat_l, lon_l = _instancia(semente, n_locais)
+    ponteiros, pontos = localizacao.conjuntos_cobertura(lat_d, lon_d, lat_l, lon_l, 2.0)
+
+    for k in range(1, n_locais + 1):
+        escolhidos, ganhos = localizacao.guloso_preguicoso(ponteiros, pontos, peso, k)
+        # Mesmas escolhas do guloso que recalcula tudo, e os ganhos somam a cobertura
+        assert escolhidos == _guloso_simples(ponteiros, pontos, peso, k)
+        coberto = _cobertura(ponteiros, pontos, peso, escolhidos)
+        assert sum(ganhos) == pytest.approx(coberto)
+        assert all(a >= b for a, b in zip(ganhos, ganhos[1:]))
+
+        # Garantia do guloso para cobertura máxima: pelo menos (1 - 1/e) do ótimo
+        otimo = max(_cobertura(ponteiros, pontos, peso, list(c)) for c in combinations(range(n_locais), k))
+        assert coberto <= otimo + 1e-9
+        assert coberto >= (1 - 1 / np.e) * otimo - 1e-9
+
+
+def test_caso_em_que_o_guloso_nao_e_otimo():
+    # Local 0 cobre o meio de cada lado; os locais 1 e 2 cobrem um lado inteiro cada
+    ponteiros = np.array([0, 4, 7, 10])
+    pontos = np.array([1, 2, 4, 5, 0, 1, 2, 3, 4, 5])
+    peso = np.array([1.0, 2.0, 2.0, 1.5, 2.0, 2.0])
+
+    escolhidos, ganhos = localizacao.guloso_preguicoso(ponteiros, pontos, peso, 2)
+    assert escolhidos == [0, 2] and ganhos == [8.0, 1.5]
+    assert _cobertura(ponteiros, pontos, peso, [1, 2]) == 10.5
+
+
+def test_para_quando_nada_mais_acrescenta():
+    ponteiros = np.array([0, 2, 4, 5])
+    pontos = np.array([0, 1, 0, 1, 2])
+    peso = np.array([3.0, 4.0, 0.0])
+
+    escolhidos, ganhos = localizacao.guloso_preguicoso(ponteiros, pontos, peso, 3)
+    assert escolhidos == [0] and ganhos == [7.0]
+
+
+def test_planejar_desconta_unidades_existentes():
+    lat_d, lon_d, peso, lat_l, lon_l = _instancia(3, 8)
+    plano = localizacao.planejar(lat_d, lon_d, peso, lat_l, lon_l, 3, lat_l[:1], lon_l[:1], 2.0)
+
+    coberto = localizacao.cobertos(lat_d, lon_d, lat_l[:1], lon_l[:1], 2.0)
+    ponteiros, pontos = localizacao.conjuntos_cobertura(lat_d, lon_d, lat_l, lon_l, 2.0)
+    assert 0 not in plano['escolhidos']  # O local da unidade existente não acrescenta nada
+    assert plano['total'] == pytest.approx(peso.sum())
+    assert plano['coberto_existentes'] == pytest.approx(peso[coberto].sum())
+    assert plano['coberto_plano'] == pytest.approx(_cobertura(ponteiros, pontos, peso, plano['escolhidos'], coberto))
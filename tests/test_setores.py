@@ -0,0 +1,73 @@
+"""Agregação dos setores por bairro e score percentil dentro do município"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import setores
+
+
+@pytest.fixture
+def tabela():
+    """Dois municípios; grafias diferentes do mesmo bairro e um setor sem bairro"""
+    return pd.DataFrame({
+        'Codigo_Setor': np.arange(1, 9),
+        'Codigo_IBGE': [3550308] * 5 + [3304557] * 3,
+        'bairro': ['Mooca', 'MOÓCA ', 'Pinheiros', 'Sé', None, 'Leblon', 'Méier', 'Meier'],
+        'populacao': [1000, 3000, 2000, 500, 800, 1500, 1000, 1000],
+        'domicilios': [400, 1000, 800, 250, 300, 600, 400, 400],
+        'domicilios_ab': [80, 100, 400, 25, 30, 450, 40, 40],
+        'renda_total': [2e6, 4e6, 1e7, 5e5, 6e5, 1.5e7, 1e6, 1e6],
+        'area_km2': [0.5, 1.0, 0.4, 0.2, 0.3, 0.3, 0.5, 0.5],
+        'lat': [-23.55, -23.56, -23.56, -23.55, -23.6, -22.98, -22.90, -22.91],
+        'lon': [-46.60, -46.59, -46.69, -46.63, -46.6, -43.22, -43.28, -43.27]
+    })
+
+
+def test_agregar_bairros_soma_por_nome_normalizado(tabela):
+    agregado = setores.agregar_bairros(tabela).set_index(['Codigo_IBGE', 'chave'])
+
+    # Setor sem bairro fica de fora; "Mooca"/"MOÓCA " e "Méier"/"Meier" viram um bairro só
+    assert sorted(agregado.index) == [(3304557, 'leblon'), (3304557, 'meier'),
+                                      (3550308, 'mooca'), (3550308, 'pinheiros'), (3550308, 'se')]
+    mooca = agregado.loc[(3550308, 'mooca')]
+    assert mooca['setores'] == 2
+    assert mooca['populacao'] == 4000 and mooca['domicilios'] == 1400 and mooca['domicilios_ab'] == 180
+    assert mooca['area_km2'] == pytest.approx(1.5)
+    # Centroide ponderado pela população dos setores
+    assert mooca['lat'] == pytest.approx((-23.55 * 1000 + -23.56 * 3000) / 4000)
+    assert mooca['lon'] == pytest.approx((-46.60 * 1000 + -46.59 * 3000) / 4000)
+
+
+def test_score_e_percentil_dentro_do_municipio(tabela):
+    pontuado = setores.pontuar_setores(tabela)
+
+    for _, bairros in pontuado.groupby('Codigo_IBGE'):
+        # Percentil calculado à mão: posição do score bruto entre os bairros do município
+        posicao = bairros['score_bruto'].to_numpy().argsort().argsort() + 1
+        np.testing.assert_array_equal(bairros['score'], np.round(posicao / len(bairros) * 100))
+        assert bairros['score'].max() == 100
+
+    # O melhor bairro de cada município tem 100, mesmo com score bruto muito diferente
+    melhores = pontuado.loc[pontuado.groupby('Codigo_IBGE')['score_bruto'].idxmax(), 'chave']
+    assert sorted(melhores) == ['leblon', 'pinheiros']
+
+
+def test_fatores_do_score(tabela):
+    pinheiros = setores.pontuar_setores(tabela).set_index('chave').loc['pinheiros']
+
+    assert pinheiros['classe_ab_pct'] == pytest.approx(50.0)
+    assert pinheiros['renda_media'] == pytest.approx(12500.0)
+    assert pinheiros['densidade'] == pytest.approx(5000.0)
+    # Renda do município: setores com bairro (o setor sem bairro não entra)
+    renda_municipio = (2e6 + 4e6 + 1e7 + 5e5) / (400 + 1000 + 800 + 250)
+    esperado = 2000 * (50 / setores.CLASSE_AB_BASE) * (12500 / renda_municipio) * (5000 / setores.DENSIDADE_BASE)
+    assert pinheiros['score_bruto'] == pytest.approx(esperado)
+
+
+def test_carregar_setores(tabela, tmp_path):
+    assert setores.carregar_setores(str(tmp_path / 'nao_existe.csv')) is None
+
+    caminho = tmp_path / 'setores.csv'
+    tabela.assign(extra=1).to_csv(caminho, index=False)
+    assert list(setores.carregar_setores(str(caminho)).columns) == setores.COLUNAS_SETORES